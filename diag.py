@@ -1,6 +1,13 @@
-"""Quick SerpAPI diagnostic -- run from repo root."""
+"""Quick SerpAPI diagnostic -- run from repo root. Pass --no-cache to skip the local response cache."""
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
 from serpapi import GoogleSearch
 from flight_search import config
+from flight_search.flight_fetcher import _cache_lookup, _cache_store
+
+if "--no-cache" in sys.argv:
+    config.NO_CACHE = True
 
 extra_tests = [
     ("DCA,IAD,BWI", "MIA"),
@@ -8,23 +15,7 @@ extra_tests = [
     ("DCA,IAD,BWI", "MIA,FLL"),
 ]
 
-for dep, arr in extra_tests:
-    params = {
-        "engine": "google_flights", "api_key": config.SERPAPI_KEY,
-        "departure_id": dep, "arrival_id": arr,
-        "outbound_date": "2026-03-28", "return_date": "2026-04-05",
-        "type": "1", "travel_class": "1", "adults": "2", "children": "2",
-        "stops": "1", "currency": "USD", "hl": "en", "gl": "us",
-    }
-    r = GoogleSearch(params).get_dict()
-    err = r.get("error")
-    groups = r.get("best_flights", []) + r.get("other_flights", [])
-    if err:
-        print(f"  FAIL [{dep}->{arr}]: {err}")
-    else:
-        fl = groups[0].get("flights", [{}])[0] if groups else {}
-        print(f"  OK   [{dep}->{arr}]: {len(groups)} groups  airline={fl.get('airline')}  price=${groups[0].get('price') if groups else 'N/A'}")
-
+tests = [
     # (label, departure_id, arrival_id, stops, outbound_times, return_times)
     ("DCA->MIA nonstop no-time",   "DCA", "MIA",     "1", None,    None),
     ("WAS->MIA nonstop no-time",   "WAS", "MIA",     "1", None,    None),
@@ -33,10 +24,11 @@ for dep, arr in extra_tests:
     ("WAS->MIA any stops no-time", "WAS", "MIA",     "0", None,    None),
 ]
 
-for label, dep, arr, stops, ot, rt in tests:
-    params = {
+
+def _base_params(dep: str, arr: str, stops: str) -> dict:
+    return {
         "engine": "google_flights",
-        "api_key": config.SERPAPI_KEY,
+        "api_key": config.serpapi_key(),
         "departure_id": dep,
         "arrival_id": arr,
         "outbound_date": "2026-03-28",
@@ -50,19 +42,58 @@ for label, dep, arr, stops, ot, rt in tests:
         "hl": "en",
         "gl": "us",
     }
+
+
+def _search(params: dict) -> tuple[dict, bool]:
+    """
+    Return (response, from_cache). Repeat runs are served from the same local
+    cache the main tool uses; fresh successful responses are stored in it
+    (the cache serializes its own access, so workers can write directly).
+    """
+    cached = _cache_lookup(params)
+    if cached is not None:
+        return cached, True
+    r = GoogleSearch(params).get_dict()
+    if not r.get("error"):
+        _cache_store(params, r)
+    return r, False
+
+
+def run_extra(case: tuple) -> tuple[str, bool]:
+    dep, arr = case
+    r, from_cache = _search(_base_params(dep, arr, "1"))
+    err = r.get("error")
+    groups = r.get("best_flights", []) + r.get("other_flights", [])
+    if err:
+        return f"  FAIL [{dep}->{arr}]: {err}", from_cache
+    fl = groups[0].get("flights", [{}])[0] if groups else {}
+    return f"  OK   [{dep}->{arr}]: {len(groups)} groups  airline={fl.get('airline')}  price=${groups[0].get('price') if groups else 'N/A'}", from_cache
+
+
+def run_one(case: tuple) -> tuple[str, bool]:
+    label, dep, arr, stops, ot, rt = case
+    params = _base_params(dep, arr, stops)
     if ot:
         params["outbound_times"] = ot
     if rt:
         params["return_times"] = rt
 
-    r = GoogleSearch(params).get_dict()
+    r, from_cache = _search(params)
     err = r.get("error")
     if err:
-        print(f"  FAIL [{label}]: {err}")
-    else:
-        groups = r.get("best_flights", []) + r.get("other_flights", [])
-        print(f"  OK   [{label}]: {len(groups)} groups", end="")
-        if groups:
-            fl = groups[0].get("flights", [{}])[0]
-            print(f" | {fl.get('airline')} ${groups[0].get('price')}", end="")
-        print()
+        return f"  FAIL [{label}]: {err}", from_cache
+    groups = r.get("best_flights", []) + r.get("other_flights", [])
+    line = f"  OK   [{label}]: {len(groups)} groups"
+    if groups:
+        fl = groups[0].get("flights", [{}])[0]
+        line += f" | {fl.get('airline')} ${groups[0].get('price')}"
+    return line, from_cache
+
+
+# Every case is one blocking HTTPS round-trip, so run them concurrently.
+# executor.map yields in submission order, so output order is unchanged.
+with ThreadPoolExecutor(max_workers=min(8, len(extra_tests) + len(tests))) as pool:
+    extra_lines = pool.map(run_extra, extra_tests)
+    test_lines = pool.map(run_one, tests)
+    for line, from_cache in [*extra_lines, *test_lines]:
+        print(f"{line}  (cached)" if from_cache else line)
@@ -1,5 +1,5 @@
 """
-seed_cache.py — Build .serp_cache.json from prior Excel exports.
+seed_cache.py — Build the SerpAPI response cache (.serp_cache.db) from prior Excel exports.
 
 Reads all flights_*.xlsx files in the project root, reconstructs minimal
 SerpAPI-compatible response structures, then writes them into the local
@@ -16,81 +16,205 @@ Usage:
 
 from __future__ import annotations
 
-import json
+import os
 import re
 import sys
-from datetime import datetime, timezone
+import time
+import zipfile
+import xml.etree.ElementTree as ET
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-
-import openpyxl
+from typing import Iterator
 
 ROOT = Path(__file__).resolve().parent
 sys.path.insert(0, str(ROOT / "src"))
 
 from flight_search import config          # noqa: E402
 from flight_search.llm_parser import parse_query    # noqa: E402
-from flight_search.flight_fetcher import _build_params, _cache_key  # noqa: E402
+from flight_search.flight_fetcher import (  # noqa: E402
+    _build_independent_oneway_params, _build_params, _cache_key, _cache_size, _cache_store_many,
+)
 
 DRY_RUN = "--dry-run" in sys.argv
 
 SEP = "→"   # unicode arrow used in route cells (U+2192)
 
+# Split points tried in order: the lazy left group makes the earliest separator
+# win, and the alternation order prefers "->" over a bare "-" at the same spot.
+_ROUTE_RE = re.compile(rf"(.+?)(?:{re.escape(SEP)}|->|-)(.+)").match
+_DUR_RE = re.compile(r"(\d+)h\s*(\d+)m").match
+
+# "2026-03-29 21:43" → "2026-03-29T2143" in a single pass, for segment tags
+_TAG_TRANS = str.maketrans({" ": "T", ":": ""})
+
+# SpreadsheetML main namespace, as it appears in ElementTree tag names
+_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+
 
 # ── Helpers ────────────────────────────────────────────────────────────────────
 
+# Both parsers see the same few hundred distinct cell values across thousands
+# of rows, so results are memoized.
+
+@lru_cache(maxsize=1024)
+def _parse_duration_text(s: str) -> int:
+    m = _DUR_RE(s)
+    return int(m.group(1)) * 60 + int(m.group(2)) if m else 0
+
+
 def _parse_duration_mins(s: str) -> int:
     """Convert '2h 46m' → 166."""
-    m = re.match(r"(\d+)h\s*(\d+)m", str(s or ""))
-    return int(m.group(1)) * 60 + int(m.group(2)) if m else 0
+    return _parse_duration_text(s) if isinstance(s, str) else 0
 
 
+@lru_cache(maxsize=2048)
 def _parse_route(route_str: str) -> tuple[str, str]:
     """'BWI→FLL' or 'BWI->FLL' → ('BWI', 'FLL')."""
-    for sep in (SEP, "->", "-"):
-        if sep in str(route_str):
-            parts = str(route_str).split(sep, 1)
-            return parts[0].strip(), parts[1].strip()
-    return "", ""
+    m = _ROUTE_RE(route_str)
+    return (sys.intern(m.group(1).strip()), sys.intern(m.group(2).strip())) if m else ("", "")
+
+
+# Key layouts for the synthetic SerpAPI dicts below. Copying a prebuilt dict
+# is cheaper than building one key by key for every row. The shared empty
+# tuples/dict are never mutated — these structures are only serialized.
+_SEG_TEMPLATE: dict = {
+    "airline": "",
+    "flight_number": "",
+    "airplane": "",
+    "legroom": "",
+    "travel_class": "Economy",
+    "extensions": (),
+    "departure_airport": None,
+    "arrival_airport": None,
+}
+
+_GROUP_TEMPLATE: dict = {
+    "flights": None,
+    "layovers": (),
+    "total_duration": 0,
+    "price": 0,
+    "carbon_emissions": {},
+}
 
 
 def _make_segment(airline: str, depart_time: str, arrive_time: str,
                   orig: str, dest: str, tag: str) -> dict:
     """Build a minimal SerpAPI flight segment dict."""
-    fn = f"{airline[:2].upper()}-SYN-{tag}"
-    return {
-        "airline": airline,
-        "flight_number": fn,
-        "airplane": "",
-        "legroom": "",
-        "travel_class": "Economy",
-        "extensions": [],
-        "departure_airport": {"id": orig, "time": str(depart_time)},
-        "arrival_airport": {"id": dest, "time": str(arrive_time)},
-    }
-
-
-# ── Read all Excel files ───────────────────────────────────────────────────────
-
-excel_files = sorted(ROOT.glob("flights_*.xlsx"), reverse=True)
-if not excel_files:
-    print("❌  No flights_*.xlsx files found in project root.")
-    sys.exit(1)
-
-print(f"📂  Found {len(excel_files)} Excel file(s):\n")
-for f in excel_files:
-    print(f"    {f.name}")
-print()
-
-# Structures to accumulate data across all files
-# Keys: (outbound_date_str, return_date_str)
-rt_groups:       dict[tuple, list[dict]] = {}  # Round-Trip groups (include return_flights)
-ow_out_groups:   dict[tuple, list[dict]] = {}  # One-way outbound groups, keyed by (out_date, ret_date)
-ow_ret_groups:   dict[tuple, list[dict]] = {}  # One-way return  groups, keyed by (out_date, ret_date)
-
-# Dedup sets to avoid processing same flight twice across files
-rt_seen:      set[str] = set()
-ow_out_seen:  set[str] = set()
-ow_ret_seen:  set[str] = set()
+    seg = _SEG_TEMPLATE.copy()
+    seg["airline"] = airline
+    seg["flight_number"] = f"{airline[:2].upper()}-SYN-{tag}"
+    seg["departure_airport"] = {"id": orig, "time": str(depart_time)}
+    seg["arrival_airport"] = {"id": dest, "time": str(arrive_time)}
+    return seg
+
+
+def _make_group(seg: dict, duration: int, price: int) -> dict:
+    """Build a minimal single-segment SerpAPI flight group dict."""
+    group = _GROUP_TEMPLATE.copy()
+    group["flights"] = [seg]
+    group["total_duration"] = duration
+    group["price"] = price
+    return group
+
+
+# ── Streaming XLSX reader ──────────────────────────────────────────────────────
+# Our exports are plain single-sheet workbooks, so rather than going through
+# openpyxl's Cell objects we iterparse the sheet XML straight out of the zip,
+# clearing each <row> once read so memory stays flat regardless of file size.
+
+class _SharedStrings:
+    """
+    Index-addressable view of xl/sharedStrings.xml that is parsed only as far
+    as the highest index requested so far. Strings are numbered in first-use
+    order, so rejecting a file on its header row touches only a handful of
+    entries, and accepted files parse the table in step with the sheet.
+    """
+
+    def __init__(self, zf: zipfile.ZipFile) -> None:
+        self._items: list[str] = []
+        self._file = None
+        self._events: Iterator = iter(())
+        if "xl/sharedStrings.xml" in zf.namelist():
+            self._file = zf.open("xl/sharedStrings.xml")
+            self._events = ET.iterparse(self._file, events=("end",))
+
+    def __getitem__(self, idx: int) -> str:
+        items = self._items
+        si_tag = _NS + "si"
+        while idx >= len(items):
+            el = next(self._events, (None, None))[1]
+            if el is None:
+                raise IndexError(f"shared string {idx} out of range")
+            if el.tag == si_tag:
+                items.append("".join(t.text or "" for t in el.iter(_NS + "t")))
+                el.clear()
+        return items[idx]
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+
+
+def _col_index(ref: str) -> int:
+    """'A3' → 1, 'N3' → 14 (1-based column number of a cell reference)."""
+    n = 0
+    for ch in ref:
+        if ch.isdigit():
+            break
+        n = n * 26 + ord(ch) - 64
+    return n
+
+
+def _cell_value(c: ET.Element, sst: _SharedStrings) -> str:
+    """
+    Resolve a <c> element to its text ("" if it has no value). Numbers are left
+    as their raw text — only the price columns need them, and those are
+    converted at the use site.
+    """
+    t = c.get("t")
+    if t == "inlineStr":
+        return "".join(x.text or "" for x in c.iter(_NS + "t"))
+    v = c.findtext(_NS + "v")
+    if v is None:
+        return ""
+    return sst[int(v)] if t == "s" else v
+
+
+def _iter_sheet_rows(path: Path, ncols: int) -> Iterator[tuple[str, ...]]:
+    """
+    Yield the first worksheet's rows from row 1 as ncols-wide tuples of cell
+    text, with "" for empty cells, so callers never need to coerce. Rows
+    missing from the XML are yielded as all-blank tuples so callers can
+    still stop on the first blank row.
+    Callers that stop early should close() the generator to release the zip.
+    """
+    with zipfile.ZipFile(path) as zf:
+        sst = _SharedStrings(zf)
+        try:
+            with zf.open("xl/worksheets/sheet1.xml") as f:
+                expected = 1
+                for _, el in ET.iterparse(f, events=("end",)):
+                    if el.tag != _NS + "row":
+                        continue
+                    row_num = int(el.get("r", expected))
+                    while expected < row_num:
+                        yield ("",) * ncols
+                        expected += 1
+                    values = [""] * ncols
+                    for col, c in enumerate(el.iter(_NS + "c"), start=1):
+                        col = _col_index(c.get("r", "")) or col
+                        if col <= ncols:
+                            values[col - 1] = _cell_value(c, sst)
+                    el.clear()
+                    yield tuple(values)
+                    expected += 1
+        finally:
+            sst.close()
+
+
+# ── Per-file ingest ────────────────────────────────────────────────────────────
 
 EXPECTED_HEADERS = [
     "Type", "Outbound Airline", "Outbound DateTime", "Outbound Arrive",
@@ -99,34 +223,51 @@ EXPECTED_HEADERS = [
     "Outbound Price", "Return Price", "Total Price",
 ]
 
-for excel_path in excel_files:
-    wb = openpyxl.load_workbook(excel_path, data_only=True)
-    ws = wb.active
+# One ingested file: (skip reason or None, RT, OW-out, OW-ret entries), each
+# entry being (date_key, dedup_key, group) in row order.
+_Ingested = tuple[str | None, list[tuple], list[tuple], list[tuple]]
 
-    headers = [ws.cell(2, c).value for c in range(1, 15)]
-    if headers != EXPECTED_HEADERS:
-        print(f"  ⏭️   Skipping {excel_path.name} (incompatible format: {ws.max_column} cols)")
-        continue
-    print(f"  📄  Reading {excel_path.name}")
 
-    for row in ws.iter_rows(min_row=3, values_only=True):
+def _ingest_file(excel_path: Path) -> _Ingested:
+    """
+    Rebuild the flight groups from one prior export. Runs in a worker process,
+    so it returns plain data; dedup across files is left to the caller, which
+    merges results in file order so the newest file still wins.
+    """
+    rows = _iter_sheet_rows(excel_path, len(EXPECTED_HEADERS))
+    next(rows, None)  # Title row
+    headers = list(next(rows, ("",)))
+    if headers != EXPECTED_HEADERS:
+        rows.close()
+        return f"header starts with {headers[0]!r}", [], [], []
+
+    rt:     list[tuple] = []
+    ow_out: list[tuple] = []
+    ow_ret: list[tuple] = []
+    # Dedup within the file too, so repeats aren't pickled back to the parent
+    # (tags are unique per leg; each category has its own set, so no prefixes needed)
+    rt_seen:      set[tuple[str, str]] = set()  # (outbound tag, return tag)
+    ow_out_seen:  set[str] = set()
+    ow_ret_seen:  set[str] = set()
+
+    for row in rows:
         if not row[0]:
             break  # End of data (empty row or footer)
 
-        row_type     = str(row[0]  or "")
-        o_airline    = str(row[1]  or "")
-        o_depart     = str(row[2]  or "")   # "2026-03-29 21:43"
-        o_arrive     = str(row[3]  or "")
-        o_route      = str(row[4]  or "")   # "BWI→FLL"
-        o_duration   = _parse_duration_mins(row[5])
-        r_airline    = str(row[6]  or "")
-        r_depart     = str(row[7]  or "")
-        r_arrive     = str(row[8]  or "")
-        r_route      = str(row[9]  or "")
-        r_duration   = _parse_duration_mins(row[10])
-        o_price      = int(row[11] or 0)
-        r_price_raw  = row[12]
-        r_price      = int(r_price_raw) if r_price_raw is not None else None
+        # Cells arrive as str ("" when empty), so unpack the row directly
+        (row_type, o_airline, o_depart, o_arrive, o_route, o_dur_text,
+         r_airline, r_depart, r_arrive, r_route, r_dur_text,
+         o_price_text, r_price_text, _total) = row
+        # A handful of airlines repeat across thousands of rows; intern them
+        # so every segment shares one string object per airline.
+        o_airline    = sys.intern(o_airline)
+        r_airline    = sys.intern(r_airline)
+        # o_depart e.g. "2026-03-29 21:43", o_route e.g. "BWI→FLL"
+        o_duration   = _parse_duration_mins(o_dur_text)
+        r_duration   = _parse_duration_mins(r_dur_text)
+        # Prices are stored as numbers, whose raw text may be "123.5"
+        o_price      = int(float(o_price_text or 0))
+        r_price      = int(float(r_price_text)) if r_price_text else None
 
         o_orig, o_dest = _parse_route(o_route)
         r_orig, r_dest = _parse_route(r_route)
@@ -135,185 +276,190 @@ for excel_path in excel_files:
         r_date = r_depart[:10]  # "2026-04-06"
         date_key = (o_date, r_date)
 
-        o_tag = f"{o_airline[:2].upper()}{o_depart.replace(' ','T').replace(':','')}"
-        r_tag = f"{r_airline[:2].upper()}{r_depart.replace(' ','T').replace(':','')}"
+        o_tag = o_airline[:2].upper() + o_depart.translate(_TAG_TRANS)
+        r_tag = r_airline[:2].upper() + r_depart.translate(_TAG_TRANS)
+
+        # _make_segment args per leg, shared by both row types
+        o_leg = (o_airline, o_depart, o_arrive, o_orig, o_dest, o_tag)
+        r_leg = (r_airline, r_depart, r_arrive, r_orig, r_dest, r_tag)
 
         if "Round Trip" in row_type:
-            dedup = f"RT|{o_tag}|{r_tag}"
+            dedup = (o_tag, r_tag)
             if dedup in rt_seen:
                 continue
             rt_seen.add(dedup)
 
-            o_seg = _make_segment(o_airline, o_depart, o_arrive, o_orig, o_dest, o_tag)
-            r_seg = _make_segment(r_airline, r_depart, r_arrive, r_orig, r_dest, r_tag)
-
-            group = {
-                "flights": [o_seg],
-                "layovers": [],
-                "total_duration": o_duration,
-                "price": o_price,
-                "carbon_emissions": {},
-                # Return leg attached (as _enrich_return_legs would do)
-                "return_flights": [r_seg] if r_airline else [],
-                "return_layovers": [],
-                "return_total_duration": r_duration,
-            }
-            rt_groups.setdefault(date_key, []).append(group)
+            group = _make_group(_make_segment(*o_leg), o_duration, o_price)
+            # Return leg attached (as _enrich_return_legs would do)
+            group["return_flights"] = [_make_segment(*r_leg)] if r_airline else []
+            group["return_layovers"] = ()
+            group["return_total_duration"] = r_duration
+            rt.append((date_key, dedup, group))
 
         elif "Independent One-Way" in row_type:
-            # Outbound leg
-            dedup_o = f"OW-OUT|{o_tag}"
-            if dedup_o not in ow_out_seen:
-                ow_out_seen.add(dedup_o)
-                o_seg = _make_segment(o_airline, o_depart, o_arrive, o_orig, o_dest, o_tag)
-                ow_out_groups.setdefault(date_key, []).append({
-                    "flights": [o_seg],
-                    "layovers": [],
-                    "total_duration": o_duration,
-                    "price": o_price,
-                    "carbon_emissions": {},
-                })
-
-            # Return leg
-            dedup_r = f"OW-RET|{r_tag}"
-            if r_airline and dedup_r not in ow_ret_seen:
-                ow_ret_seen.add(dedup_r)
-                r_seg = _make_segment(r_airline, r_depart, r_arrive, r_orig, r_dest, r_tag)
-                ow_ret_groups.setdefault(date_key, []).append({
-                    "flights": [r_seg],
-                    "layovers": [],
-                    "total_duration": r_duration,
-                    "price": r_price or 0,
-                    "carbon_emissions": {},
-                })
-
-print(f"📊  Loaded from Excel:")
-print(f"    Round-trip groups  : {sum(len(v) for v in rt_groups.values())} across {len(rt_groups)} date pair(s)")
-print(f"    OW outbound groups : {sum(len(v) for v in ow_out_groups.values())} across {len(ow_out_groups)} date pair(s)")
-print(f"    OW return groups   : {sum(len(v) for v in ow_ret_groups.values())} across {len(ow_ret_groups)} date pair(s)")
-print()
-
-
-# ── Parse current query to get new combination params ─────────────────────────
-
-query_file = ROOT / "query.txt"
-print("🤖  Parsing current query (reuses .last_parse.json if query unchanged)...")
-q = query_file.read_text(encoding="utf-8")
-parsed = parse_query(q)
-print(f"    {len(parsed.combinations)} combinations found.\n")
-
-
-# ── Build cache entries ────────────────────────────────────────────────────────
-
-now_ts = datetime.now(timezone.utc).timestamp()
-cache: dict = {}
-seeded_rt = seeded_ow_out = seeded_ow_ret = 0
-
-for combo in parsed.combinations:
-    out_date = combo.outbound_date
-    ret_date = combo.return_date or ""
-    date_key = (out_date, ret_date)
-
-    # ── Round-trip main call ───────────────────────────────────────────────────
-    rt_data = rt_groups.get(date_key, [])
-    if rt_data:
-        params = _build_params(combo)
-        key = _cache_key(params)
-        cache[key] = {
-            "timestamp": now_ts,
-            "response": {
+            # Each leg is its own one-way group; a blank return airline means
+            # there is no return leg on this row.
+            legs = (
+                (o_leg, o_duration, o_price,      ow_out_seen, ow_out),
+                (r_leg, r_duration, r_price or 0, ow_ret_seen, ow_ret),
+            )
+            for leg, duration, price, seen, entries in legs[:2 if r_airline else 1]:
+                tag = leg[5]
+                if tag in seen:
+                    continue
+                seen.add(tag)
+                entries.append(
+                    (date_key, tag, _make_group(_make_segment(*leg), duration, price))
+                )
+
+    rows.close()
+    return None, rt, ow_out, ow_ret
+
+
+def main() -> None:
+    # ── Read all Excel files ──────────────────────────────────────────────────
+
+    excel_files = sorted(ROOT.glob("flights_*.xlsx"), reverse=True)
+    if not excel_files:
+        print("❌  No flights_*.xlsx files found in project root.")
+        sys.exit(1)
+
+    print(f"📂  Found {len(excel_files)} Excel file(s):\n")
+    for f in excel_files:
+        print(f"    {f.name}")
+    print()
+
+    # Structures to accumulate data across all files
+    # Keys: (outbound_date_str, return_date_str)
+    rt_groups:       defaultdict[tuple, list[dict]] = defaultdict(list)  # Round-Trip groups (include return_flights)
+    ow_out_groups:   defaultdict[tuple, list[dict]] = defaultdict(list)  # One-way outbound groups, keyed by (out_date, ret_date)
+    ow_ret_groups:   defaultdict[tuple, list[dict]] = defaultdict(list)  # One-way return  groups, keyed by (out_date, ret_date)
+
+    # Dedup sets to avoid processing same flight twice across files
+    # (tags are unique per leg; each category has its own set, so no prefixes needed)
+    rt_seen:      set[tuple[str, str]] = set()  # (outbound tag, return tag)
+    ow_out_seen:  set[str] = set()
+    ow_ret_seen:  set[str] = set()
+
+    # Files are independent until the merge, and parsing is CPU-bound, so spread
+    # them over worker processes; map() keeps results in file order.
+    if len(excel_files) > 1:
+        with ProcessPoolExecutor(max_workers=min(len(excel_files), os.cpu_count() or 1)) as pool:
+            ingested = list(pool.map(_ingest_file, excel_files))
+    else:
+        ingested = [_ingest_file(p) for p in excel_files]
+
+    for excel_path, (skip_reason, rt, ow_out, ow_ret) in zip(excel_files, ingested):
+        if skip_reason:
+            print(f"  ⏭️   Skipping {excel_path.name} (incompatible format: {skip_reason})")
+            continue
+        print(f"  📄  Reading {excel_path.name}")
+        for entries, seen, buckets in (
+            (rt,     rt_seen,     rt_groups),
+            (ow_out, ow_out_seen, ow_out_groups),
+            (ow_ret, ow_ret_seen, ow_ret_groups),
+        ):
+            for date_key, dedup, group in entries:
+                if dedup in seen:
+                    continue
+                seen.add(dedup)
+                buckets[date_key].append(group)
+    del ingested
+
+    # The dedup sets are only needed while reading; drop them so a long Excel
+    # history doesn't keep them alive through the cache build and merge.
+    del rt_seen, ow_out_seen, ow_ret_seen
+
+    print(f"📊  Loaded from Excel:")
+    print(f"    Round-trip groups  : {sum(map(len, rt_groups.values()))} across {len(rt_groups)} date pair(s)")
+    print(f"    OW outbound groups : {sum(map(len, ow_out_groups.values()))} across {len(ow_out_groups)} date pair(s)")
+    print(f"    OW return groups   : {sum(map(len, ow_ret_groups.values()))} across {len(ow_ret_groups)} date pair(s)")
+    print()
+
+    # ── Parse current query to get new combination params ─────────────────────
+
+    query_file = ROOT / "query.txt"
+    print("🤖  Parsing current query (reuses today's cached parse if query unchanged)...")
+    q = query_file.read_text(encoding="utf-8")
+    parsed = parse_query(q)
+    print(f"    {len(parsed.combinations)} combinations found.\n")
+
+    # ── Build cache entries ───────────────────────────────────────────────────
+
+    now_ts = time.time()
+    cache: dict[str, dict] = {}  # cache key → synthetic SerpAPI response
+    seeded_rt = seeded_ow_out = seeded_ow_ret = 0
+
+    for combo in parsed.combinations:
+        out_date = combo.outbound_date.isoformat()
+        ret_date = combo.return_date.isoformat() if combo.return_date else ""
+        date_key = (out_date, ret_date)
+
+        # ── Round-trip main call ──────────────────────────────────────────────
+        rt_data = rt_groups.get(date_key, [])
+        if rt_data:
+            key = _cache_key(_build_params(combo))
+            cache[key] = {
                 "best_flights": rt_data,
                 "other_flights": [],
                 "__seeded_from_excel__": True,
-            },
-        }
-        seeded_rt += 1
-        print(f"  ✅  RT  [{out_date} → {ret_date}] seeded {len(rt_data)} group(s)")
-    else:
-        print(f"  ⬜  RT  [{out_date} → {ret_date}] no prior data — will fetch fresh")
-
-    # ── Independent one-way outbound ───────────────────────────────────────────
-    # Reproduce the exact param logic from fetch_all
-    if combo.type == 1 and combo.return_date:
-        base = _build_params(combo)
-        base.pop("include_airlines", None)
-        base.pop("exclude_airlines", None)
-
-        # Outbound OW params
-        out_p = dict(base)
-        out_p["type"] = "2"
-        out_p.pop("return_date", None)
-        out_p.pop("return_times", None)
-        if out_p.get("outbound_times"):
-            parts = out_p["outbound_times"].split(",")
-            if len(parts) == 4:
-                out_p["outbound_times"] = f"{parts[0]},{parts[1]}"
-
-        # Return OW params
-        ret_p = dict(base)
-        ret_p["type"] = "2"
-        ret_p["departure_id"] = combo.arrival_id
-        ret_p["arrival_id"] = combo.departure_id
-        ret_p["outbound_date"] = combo.return_date
-        ret_p.pop("return_date", None)
-        ret_p.pop("outbound_times", None)
-        if combo.return_times:
-            rt_parts = combo.return_times.split(",")
-            ret_p["outbound_times"] = (
-                f"{rt_parts[0]},{rt_parts[1]}" if len(rt_parts) >= 2 else combo.return_times
-            )
+            }
+            seeded_rt += 1
+            print(f"  ✅  RT  [{out_date} → {ret_date}] seeded {len(rt_data)} group(s)")
+        else:
+            print(f"  ⬜  RT  [{out_date} → {ret_date}] no prior data — will fetch fresh")
 
+        # ── Independent one-way outbound ──────────────────────────────────────
+        # Same one-way param sets fetch_all uses, so the cache keys match
         ow_out_data = ow_out_groups.get(date_key, [])
-        if ow_out_data:
-            key = _cache_key(out_p)
-            cache[key] = {
-                "timestamp": now_ts,
-                "response": {
+        ow_ret_data = ow_ret_groups.get(date_key, [])
+        if combo.type == 1 and combo.return_date and (ow_out_data or ow_ret_data):
+            out_p, ret_p = _build_independent_oneway_params(combo)
+
+            if ow_out_data:
+                key = _cache_key(out_p)
+                cache[key] = {
                     "best_flights": ow_out_data,
                     "other_flights": [],
                     "__seeded_from_excel__": True,
-                },
-            }
-            seeded_ow_out += 1
-            print(f"  ✅  OW-out [{out_date}] seeded {len(ow_out_data)} group(s)")
+                }
+                seeded_ow_out += 1
+                print(f"  ✅  OW-out [{out_date}] seeded {len(ow_out_data)} group(s)")
 
-        ow_ret_data = ow_ret_groups.get(date_key, [])
-        if ow_ret_data:
-            key = _cache_key(ret_p)
-            cache[key] = {
-                "timestamp": now_ts,
-                "response": {
+            if ow_ret_data:
+                key = _cache_key(ret_p)
+                cache[key] = {
                     "best_flights": ow_ret_data,
                     "other_flights": [],
                     "__seeded_from_excel__": True,
-                },
-            }
-            seeded_ow_ret += 1
-            print(f"  ✅  OW-ret [{ret_date}] seeded {len(ow_ret_data)} group(s)")
-
-print()
-total_keys = len(cache)
-print(f"📦  Cache entries prepared : {total_keys}")
-print(f"    Round-trip seeded      : {seeded_rt}/{len(parsed.combinations)}")
-print(f"    OW outbound seeded     : {seeded_ow_out}/{len(parsed.combinations)}")
-print(f"    OW return seeded       : {seeded_ow_ret}/{len(parsed.combinations)}")
-print(f"    TTL                    : {config.SERPAPI_CACHE_TTL_HOURS}h from now")
-print()
-
-if DRY_RUN:
-    print("🔍  Dry run — cache NOT written.")
-else:
-    # Merge with any existing cache (don't overwrite unrelated entries)
-    existing: dict = {}
-    if config.CACHE_FILE.exists():
-        try:
-            existing = json.loads(config.CACHE_FILE.read_text(encoding="utf-8"))
-            print(f"    Merging with {len(existing)} existing cache entries...")
-        except (json.JSONDecodeError, OSError):
-            pass
-    existing.update(cache)
-    config.CACHE_FILE.write_text(json.dumps(existing), encoding="utf-8")
-    print(f"✅  Written to: {config.CACHE_FILE}")
+                }
+                seeded_ow_ret += 1
+                print(f"  ✅  OW-ret [{ret_date}] seeded {len(ow_ret_data)} group(s)")
+
+    print()
+    total_keys = len(cache)
+    print(f"📦  Cache entries prepared : {total_keys}")
+    print(f"    Round-trip seeded      : {seeded_rt}/{len(parsed.combinations)}")
+    print(f"    OW outbound seeded     : {seeded_ow_out}/{len(parsed.combinations)}")
+    print(f"    OW return seeded       : {seeded_ow_ret}/{len(parsed.combinations)}")
+    print(f"    TTL                    : {config.SERPAPI_CACHE_TTL_HOURS}h from now")
     print()
-    print("    Run the tool normally — seeded combinations will show '🗄️ from cache'.")
-    print("    Combinations without prior data will fetch fresh from SerpAPI.")
+
+    if DRY_RUN:
+        print("🔍  Dry run — cache NOT written.")
+    elif not cache:
+        print("ℹ️   Nothing to seed — existing cache left untouched.")
+    else:
+        # Merge with any existing cache (don't overwrite unrelated entries)
+        _cache_store_many(cache, now_ts)
+        kept = _cache_size() - len(cache)  # Seeded keys replace any existing rows
+        if kept > 0:
+            print(f"    Kept {kept} existing cache entries.")
+        print(f"✅  Written to: {config.CACHE_FILE}")
+        print()
+        print("    Run the tool normally — seeded combinations will show '🗄️ from cache'.")
+        print("    Combinations without prior data will fetch fresh from SerpAPI.")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,24 +2,42 @@
 
 import os
 import sys
+from functools import cache
 from pathlib import Path
 from dotenv import load_dotenv
 
-# Load .env from project root (src/flight_search/config.py -> parents[2] = project root)
+# Project root (src/flight_search/config.py -> parents[2] = project root)
 _ROOT = Path(__file__).resolve().parents[2]
-load_dotenv(_ROOT / ".env")
 
 # ── API keys ──────────────────────────────────────────────────────────────────
+# .env is only parsed when a key is first needed, not on import — modules and
+# tests that never touch a key skip the file I/O entirely.
+
+@cache
+def _load_env() -> None:
+    load_dotenv(_ROOT / ".env")
+
+
+@cache
+def serpapi_key() -> str:
+    """SerpAPI key from the environment or .env (read once, on first use)."""
+    _load_env()
+    return os.getenv("SERPAPI_KEY", "")
+
+
+@cache
+def openai_api_key() -> str:
+    """OpenAI key from the environment or .env (read once, on first use)."""
+    _load_env()
+    return os.getenv("OPENAI_API_KEY", "")
 
-SERPAPI_KEY: str = os.getenv("SERPAPI_KEY", "")
-OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
 
 def validate_keys() -> None:
     """Raise a clear error if any required API key is missing."""
     missing = []
-    if not SERPAPI_KEY or SERPAPI_KEY == "your_serpapi_key_here":
+    if serpapi_key() in ("", "your_serpapi_key_here"):
         missing.append("SERPAPI_KEY")
-    if not OPENAI_API_KEY or OPENAI_API_KEY == "your_openai_api_key_here":
+    if openai_api_key() in ("", "your_openai_api_key_here"):
         missing.append("OPENAI_API_KEY")
     if missing:
         print(f"\n❌  Missing API key(s): {', '.join(missing)}")
@@ -43,13 +61,16 @@ SERPAPI_MONTHLY_LIMIT: int = 250
 # Seconds to wait between SerpAPI calls (stay under 50/hr limit)
 SERPAPI_CALL_DELAY: float = 1.2
 
+# Max search combinations fetched in parallel
+SERPAPI_CONCURRENCY: int = 4
+
 # OpenAI model
 OPENAI_MODEL: str = "gpt-5.2"
 
 # ── Cache settings ────────────────────────────────────────────────────────────
 
-# Local SerpAPI response cache file
-CACHE_FILE: Path = _ROOT / ".serp_cache.json"
+# Local SerpAPI response cache (sqlite database)
+CACHE_FILE: Path = _ROOT / ".serp_cache.db"
 
 # How long a cached response is considered fresh (hours)
 SERPAPI_CACHE_TTL_HOURS: int = 12
@@ -57,5 +78,6 @@ SERPAPI_CACHE_TTL_HOURS: int = 12
 # Set to True by --no-cache CLI flag to skip local cache for this run
 NO_CACHE: bool = False
 
-# Persisted GPT parse output — reused across runs so seeder and main run share params
-PARSED_CACHE_FILE: Path = _ROOT / ".last_parse.json"
+# Persisted GPT parses (sqlite, keyed by query hash) — reused across runs so
+# seeder and main run share params
+PARSED_CACHE_DB: Path = _ROOT / ".parse_cache.db"
@@ -1,14 +1,15 @@
 """Excel exporter: writes FlightResult list to a formatted .xlsx file."""
 
 from __future__ import annotations
+import io
 import os
-import statistics
 from datetime import datetime
 from pathlib import Path
+from typing import Callable
 
 from openpyxl import Workbook
-from openpyxl.worksheet.worksheet import Worksheet
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, NamedStyle
 from openpyxl.formatting.rule import CellIsRule
 from openpyxl.utils import get_column_letter
 
@@ -23,116 +24,174 @@ _GREEN_FILL  = "C6EFCE"   # green  — price below median
 _RED_FILL    = "FFC7CE"   # red    — price above 1.5 × median
 _BORDER_CLR  = "BFBFBF"
 
-# Column definitions: (header label, attribute on FlightResult, width)
-_COLUMNS: list[tuple[str, str, int]] = [
-    ("Preferred",         "preferred",                 11),
-    ("Type",              "itinerary_type",            22),
-    ("Outbound Airline",  "airline",                   20),
-    ("Outbound DateTime", "depart_time",               22),
-    ("Outbound Arrive",   "arrive_time",               22),
-    ("Outbound Route",    "origin",                    16),
-    ("Outbound Duration", "total_duration_mins",       16),
-    ("Return Airline",    "return_airline",            20),
-    ("Return DateTime",   "return_depart_time",        22),
-    ("Return Arrive",     "return_arrive_time",        22),
-    ("Return Route",      "destination",               16),
-    ("Return Duration",   "return_total_duration_mins",16),
-    ("Outbound Price",    "outbound_price",            14),
-    ("Return Price",      "return_price",              14),
-    ("Total Price",       "total_price",               14),
+# Column definitions: (header label, cell value for a FlightResult, width).
+# Each getter yields the final cell value, so rows are built without any
+# per-cell branching on the column.
+_COLUMNS: list[tuple[str, Callable[[FlightResult], object], int]] = [
+    ("Preferred",         lambda r: "✓" if r.preferred else "",                          11),
+    ("Type",              lambda r: _TYPE_LABELS.get(r.itinerary_type, "Round Trip"),   22),
+    ("Outbound Airline",  lambda r: r.airline,                                           20),
+    ("Outbound DateTime", lambda r: r.depart_time,                                       22),
+    ("Outbound Arrive",   lambda r: r.arrive_time,                                       22),
+    ("Outbound Route",    lambda r: _route_value(r, is_return=False),                    16),
+    ("Outbound Duration", lambda r: _fmt_duration(r.total_duration_mins),                16),
+    ("Return Airline",    lambda r: _blank(r.return_airline),                            20),
+    ("Return DateTime",   lambda r: _blank(r.return_depart_time),                        22),
+    ("Return Arrive",     lambda r: _blank(r.return_arrive_time),                        22),
+    ("Return Route",      lambda r: _route_value(r, is_return=True),                     16),
+    ("Return Duration",   lambda r: _fmt_duration_or_blank(r.return_total_duration_mins),16),
+    ("Outbound Price",    lambda r: _blank(r.outbound_price),                            14),
+    ("Return Price",      lambda r: _blank(r.return_price),                              14),
+    ("Total Price",       lambda r: _blank(r.total_price),                               14),
 ]
 
+_TYPE_LABELS = {"independent_one_way": "Independent One-Way"}
+
+# 1-based columns whose data cells wrap (type, arrive times, outbound duration)
+_WRAP_COLS = frozenset({2, 5, 7, 10})
+
+# Per-column views of _COLUMNS, fixed at import
+_HEADERS     = tuple(label for label, _, _ in _COLUMNS)
+_GETTERS     = tuple(get for _, get, _ in _COLUMNS)
+_WIDTHS      = tuple(width for _, _, width in _COLUMNS)
+_COL_LETTERS = tuple(get_column_letter(i) for i in range(1, len(_COLUMNS) + 1))
+_LAST_COL    = _COL_LETTERS[-1]
+_PRICE_COL   = _COL_LETTERS[_HEADERS.index("Total Price")]
+
 
 def _thin_border() -> Border:
     side = Side(style="thin", color=_BORDER_CLR)
     return Border(left=side, right=side, top=side, bottom=side)
 
 
+def _data_style_name(alt: bool, wrap: bool) -> str:
+    return "flights_data" + ("_alt" if alt else "") + ("_wrap" if wrap else "")
+
+
+# Data-cell style name per column, for plain (False) and alternate (True) rows
+_ROW_STYLES: dict[bool, tuple[str, ...]] = {
+    alt: tuple(_data_style_name(alt, col_idx in _WRAP_COLS) for col_idx in range(1, len(_COLUMNS) + 1))
+    for alt in (False, True)
+}
+
+
+def _register_styles(wb: Workbook) -> None:
+    """
+    Register the sheet's fixed cell formats on the workbook once. Cells then
+    reference a style by name instead of each carrying its own
+    Font/Fill/Alignment/Border objects.
+    """
+    wb.add_named_style(NamedStyle(
+        name="flights_title",
+        font=Font(name="Calibri", bold=True, size=13, color=_HEADER_FG),
+        fill=PatternFill("solid", fgColor=_HEADER_BG),
+        alignment=Alignment(horizontal="center", vertical="center"),
+    ))
+    wb.add_named_style(NamedStyle(
+        name="flights_header",
+        font=Font(name="Calibri", bold=True, size=10, color=_HEADER_FG),
+        fill=PatternFill("solid", fgColor="1F3864"),
+        alignment=Alignment(horizontal="center", vertical="center", wrap_text=True),
+        border=_thin_border(),
+    ))
+    # Data cells: one style per (alternate row, wrapped column) combination,
+    # all sharing the same font and border objects
+    data_font = Font(name="Calibri", size=10)
+    border = _thin_border()
+    alt_fill = PatternFill("solid", fgColor=_ROW_ALT)
+    for alt in (False, True):
+        for wrap in (False, True):
+            style = NamedStyle(
+                name=_data_style_name(alt, wrap),
+                font=data_font,
+                alignment=Alignment(vertical="center", wrap_text=wrap),
+                border=border,
+            )
+            if alt:
+                style.fill = alt_fill
+            wb.add_named_style(style)
+    wb.add_named_style(NamedStyle(
+        name="flights_summary",
+        font=Font(italic=True, size=9, color="808080"),
+    ))
+
+
+def _styled_row(ws, values, styles) -> list:
+    """One append()-ready row: a write-only cell per value, each given its named style."""
+    cells = []
+    for value, style in zip(values, styles):
+        cell = WriteOnlyCell(ws, value=value)
+        cell.style = style
+        cells.append(cell)
+    return cells
+
+
 def _fmt_duration(minutes: int) -> str:
     h, m = divmod(minutes, 60)
     return f"{h}h {m:02d}m"
 
 
+def _fmt_duration_or_blank(minutes: int | None) -> str:
+    return "" if minutes is None else _fmt_duration(minutes)
+
+
+def _blank(value: object) -> object:
+    """Empty cell for a missing optional field."""
+    return "" if value is None else value
+
+
+def _sorted_median(values: list[int]) -> float:
+    """Median of an already sorted, non-empty list (same result as statistics.median)."""
+    mid = len(values) // 2
+    return values[mid] if len(values) % 2 else (values[mid - 1] + values[mid]) / 2
+
+
 def _route_value(result: FlightResult, is_return: bool = False) -> str:
     if is_return:
         return f"{result.destination}→{result.origin}" if result.return_depart_time else ""
     return f"{result.origin}→{result.destination}"
 
 
-def export(results: list[FlightResult], query_summary: str, output_dir: Path = Path(".")) -> Path:
+def export(
+    results: list[FlightResult],
+    query_summary: str,
+    output_dir: Path = Path("."),
+) -> Path:
     """
     Write results to an xlsx file and return the file path.
+    The workbook is built in openpyxl write-only mode: rows are serialized as
+    they are appended instead of being kept as a cell tree, so memory stays
+    flat however many results there are.
     Auto-opens the file on Windows.
     """
-    wb = Workbook()
-    # wb.worksheets[0] is always Worksheet (not Optional) on a fresh Workbook
-    ws: Worksheet = wb.worksheets[0]
-    ws.title = "Flights"
-
-    # ── Freeze pane & sheet title row ──────────────────────────────────────────
-    title_text = f"Flight Results — {query_summary}"
-    ws.merge_cells(start_row=1, start_column=1, end_row=1, end_column=len(_COLUMNS))
-    title_cell = ws.cell(row=1, column=1, value=title_text)
-    title_cell.font = Font(name="Calibri", bold=True, size=13, color=_HEADER_FG)
-    title_cell.fill = PatternFill("solid", fgColor=_HEADER_BG)
-    title_cell.alignment = Alignment(horizontal="center", vertical="center")
-    ws.row_dimensions[1].height = 22
-
-    # ── Header row ─────────────────────────────────────────────────────────────
-    header_fill = PatternFill("solid", fgColor="1F3864")
-    for col_idx, (label, _, width) in enumerate(_COLUMNS, start=1):
-        cell = ws.cell(row=2, column=col_idx, value=label)
-        cell.font = Font(name="Calibri", bold=True, size=10, color=_HEADER_FG)
-        cell.fill = header_fill
-        cell.alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-        cell.border = _thin_border()
-        ws.column_dimensions[get_column_letter(col_idx)].width = width
-    ws.row_dimensions[2].height = 28
-
-    # ── Data rows ──────────────────────────────────────────────────────────────
-    alt_fill = PatternFill("solid", fgColor=_ROW_ALT)
-    for row_idx, result in enumerate(results, start=3):
-        is_alt = (row_idx % 2 == 0)
-        for col_idx, (_, attr, _) in enumerate(_COLUMNS, start=1):
-            if attr == "origin":
-                value = _route_value(result, is_return=False)
-            elif attr == "destination":
-                value = _route_value(result, is_return=True)
-            else:
-                value = getattr(result, attr)
-            # Format duration column
-            if attr in ("total_duration_mins", "return_total_duration_mins") and isinstance(value, int):
-                value = _fmt_duration(value)
-            if value is None:
-                value = ""
-            if attr == "preferred":
-                value = "✓" if value else ""
-            if attr == "itinerary_type":
-                value = "Independent One-Way" if value == "independent_one_way" else "Round Trip"
-            cell = ws.cell(row=row_idx, column=col_idx, value=value)
-            cell.font = Font(name="Calibri", size=10)
-            cell.alignment = Alignment(vertical="center", wrap_text=(col_idx in (2, 5, 7, 10)))
-            cell.border = _thin_border()
-            if is_alt:
-                cell.fill = alt_fill
+    # Rows are emitted strictly top to bottom with ws.append(); sheet-level
+    # settings are applied up front because write-only mode needs them
+    # before the first row is written.
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Flights")
+    _register_styles(wb)
 
     last_data_row = 2 + len(results)
 
-    # ── Auto-filter (on header row) ────────────────────────────────────────────
-    ws.auto_filter.ref = f"A2:{get_column_letter(len(_COLUMNS))}{last_data_row}"
+    # ── Column widths & row heights ────────────────────────────────────────────
+    for letter, width in zip(_COL_LETTERS, _WIDTHS):
+        ws.column_dimensions[letter].width = width
+    ws.row_dimensions[1].height = 22
+    ws.row_dimensions[2].height = 28
 
-    # ── Freeze top 2 rows ──────────────────────────────────────────────────────
+    # ── Merged title, auto-filter (on header row) & freeze top 2 rows ──────────
+    ws.merged_cells.add(f"A1:{_LAST_COL}1")
+    ws.auto_filter.ref = f"A2:{_LAST_COL}{last_data_row}"
     ws.freeze_panes = "A3"
 
-    # ── Conditional formatting on Total Price column (col 15 = "O") ─────────────────
-    price_col = "O"
-    price_range = f"{price_col}3:{price_col}{last_data_row}"
-    prices = [
-        (r.total_price if r.total_price is not None else r.price)
-        for r in results
-        if (r.total_price if r.total_price is not None else r.price) > 0
-    ]
-    median_price: float = statistics.median(prices) if prices else 0.0
+    # ── Conditional formatting on Total Price column (found by its header) ────────
+    price_range = f"{_PRICE_COL}3:{_PRICE_COL}{last_data_row}"
+    # One sorted pass gives min, max and median without re-walking the list
+    prices = sorted(
+        p for r in results
+        if (p := r.total_price if r.total_price is not None else r.price) > 0
+    )
+    median_price: float = _sorted_median(prices) if prices else 0.0
     if prices:
         threshold_low  = int(median_price)
         threshold_high = int(median_price * 1.5)
@@ -154,22 +213,38 @@ def export(results: list[FlightResult], query_summary: str, output_dir: Path = P
             ),
         )
 
+    # ── Sheet title row ────────────────────────────────────────────────────────
+    ws.append(_styled_row(ws, [f"Flight Results — {query_summary}"], ["flights_title"]))
+
+    # ── Header row ─────────────────────────────────────────────────────────────
+    ws.append(_styled_row(ws, _HEADERS, ["flights_header"] * len(_HEADERS)))
+
+    # ── Data rows ──────────────────────────────────────────────────────────────
+    # Rows are built lazily and streamed straight into the sheet's XML, so
+    # only one row's cells are alive at a time.
+    data_rows = (
+        _styled_row(ws, (get(result) for get in _GETTERS), _ROW_STYLES[row_idx % 2 == 0])
+        for row_idx, result in enumerate(results, start=3)
+    )
+    for row in data_rows:
+        ws.append(row)
+
     # ── Summary info at the bottom ────────────────────────────────────────────
-    summary_row = last_data_row + 2
-    ws.cell(row=summary_row, column=1, value=f"Total flights shown: {len(results)}")
-    ws.cell(row=summary_row, column=1).font = Font(italic=True, size=9, color="808080")
+    ws.append([])  # Spacer row
+    summary_lines = [f"Total flights shown: {len(results)}"]
     if prices:
-        ws.cell(row=summary_row + 1, column=1,
-                value=f"Price range: ${min(prices)} – ${max(prices)}  |  Median: ${int(median_price)}")
-        ws.cell(row=summary_row + 1, column=1).font = Font(italic=True, size=9, color="808080")
-        ws.cell(row=summary_row + 2, column=1,
-                value="🟢 Green = at or below median price   🔴 Red = above 1.5× median price")
-        ws.cell(row=summary_row + 2, column=1).font = Font(italic=True, size=9, color="808080")
+        summary_lines.append(f"Price range: ${prices[0]} – ${prices[-1]}  |  Median: ${int(median_price)}")
+        summary_lines.append("🟢 Green = at or below median price   🔴 Red = above 1.5× median price")
+    for line in summary_lines:
+        ws.append(_styled_row(ws, [line], ["flights_summary"]))
 
     # ── Save ───────────────────────────────────────────────────────────────────
     timestamp = datetime.now().strftime("%Y-%m-%d_%H%M%S")
     filename = output_dir / f"flights_{timestamp}.xlsx"
-    wb.save(filename)
+    # Build the zip in memory, then hit the disk with one sequential write
+    buf = io.BytesIO()
+    wb.save(buf)
+    filename.write_bytes(buf.getvalue())
 
     # Auto-open on Windows
     try:
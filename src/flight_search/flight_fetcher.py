@@ -3,18 +3,38 @@
 from __future__ import annotations
 import hashlib
 import json
+import sqlite3
+import threading
 import time
-from datetime import date, datetime, timezone
+import weakref
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from functools import lru_cache
+from itertools import chain, islice
 from pathlib import Path
 from serpapi import GoogleSearch
+
+try:
+    import orjson  # Optional: much faster (de)serialization of cached responses
+except ImportError:
+    orjson = None
+
 from . import config
 from .models import PostFilter, SearchCombination
 
 
 # ── Usage tracking ─────────────────────────────────────────────────────────────
 
-def _load_usage() -> dict:
-    """Load monthly usage counter from disk."""
+# The counter is read from disk once per fetch_all() run and written back once
+# at the end (flush_usage); in between it lives in memory.
+_usage_cache: dict | None = None
+_usage_dirty = False
+_usage_lock = threading.RLock()  # fetch_all runs combinations in threads
+
+
+def _read_usage() -> dict:
+    """Read monthly usage counter from disk."""
     if not config.USAGE_FILE.exists():
         return {"month": date.today().strftime("%Y-%m"), "count": 0}
     try:
@@ -27,49 +47,124 @@ def _load_usage() -> dict:
         return {"month": date.today().strftime("%Y-%m"), "count": 0}
 
 
+def _load_usage() -> dict:
+    """Return the monthly usage counter, loading it from disk on first use."""
+    global _usage_cache
+    with _usage_lock:
+        if _usage_cache is None:
+            _usage_cache = _read_usage()
+        return _usage_cache
+
+
 def _save_usage(usage: dict) -> None:
     config.USAGE_FILE.write_text(json.dumps(usage))
 
 
+def _reset_usage() -> None:
+    """Drop the in-memory counter so the next load re-reads disk (picks up month rollover)."""
+    global _usage_cache, _usage_dirty
+    with _usage_lock:
+        _usage_cache = None
+        _usage_dirty = False
+
+
+def flush_usage() -> None:
+    """Write the in-memory counter to disk if it changed since it was loaded."""
+    global _usage_dirty
+    with _usage_lock:
+        if _usage_dirty and _usage_cache is not None:
+            _save_usage(_usage_cache)
+            _usage_dirty = False
+
+
 def get_monthly_usage() -> int:
     return _load_usage()["count"]
 
 
-def _increment_usage() -> int:
-    """Increment usage counter and return the new count."""
-    usage = _load_usage()
-    usage["count"] += 1
-    _save_usage(usage)
-    return usage["count"]
+def _reserve_usage() -> bool:
+    """
+    Claim one search from the monthly limit before calling SerpAPI (persisted by
+    flush_usage). Returns False once the limit is reached. Checking and counting
+    under one lock keeps concurrent workers from overshooting the limit; a call
+    that doesn't count hands its slot back with _release_usage().
+    """
+    global _usage_dirty
+    with _usage_lock:
+        usage = _load_usage()
+        if usage["count"] >= config.SERPAPI_MONTHLY_LIMIT:
+            return False
+        usage["count"] += 1
+        _usage_dirty = True
+        return True
+
+
+def _release_usage() -> None:
+    """Return a slot claimed by _reserve_usage() for a call that failed."""
+    global _usage_dirty
+    with _usage_lock:
+        _load_usage()["count"] -= 1
+        _usage_dirty = True
 
 
 # ── Local response cache ───────────────────────────────────────────────────────
 
+# json.dumps(..., sort_keys=True) builds a new JSONEncoder per call; reuse one.
+# Same output, so cache keys are unchanged.
+_encode_sorted = json.JSONEncoder(sort_keys=True).encode
+
+
 def _cache_key(params: dict) -> str:
     """SHA-256 of sorted params excluding api_key (which varies but is irrelevant to content)."""
-    stable = {k: v for k, v in sorted(params.items()) if k != "api_key"}
-    return hashlib.sha256(json.dumps(stable, sort_keys=True).encode()).hexdigest()
+    # sort_keys fixes the order, so the params needn't be pre-sorted
+    stable = {k: v for k, v in params.items() if k != "api_key"}
+    return hashlib.sha256(_encode_sorted(stable).encode()).hexdigest()
 
 
-def _cache_load() -> dict:
-    """Load the local cache file, returning an empty dict on any error."""
-    try:
-        if config.CACHE_FILE.exists():
-            return json.loads(config.CACHE_FILE.read_text(encoding="utf-8"))
-    except (json.JSONDecodeError, OSError):
-        pass
-    return {}
-
-
-def _cache_save(cache: dict) -> None:
-    """Save cache to disk, pruning entries older than TTL first."""
-    ttl_seconds = config.SERPAPI_CACHE_TTL_HOURS * 3600
-    now = datetime.now(timezone.utc).timestamp()
-    pruned = {k: v for k, v in cache.items() if now - v.get("timestamp", 0) < ttl_seconds}
+# Responses live in a sqlite table keyed by _cache_key, stored as
+# zlib-compressed JSON, so a lookup reads one row instead of parsing the
+# whole cache. One connection is opened lazily and reused for the process;
+# the lock serializes its use when callers (e.g. diag.py) run in threads.
+
+_cache_conn: sqlite3.Connection | None = None
+_cache_lock = threading.Lock()
+
+
+def _fresh_since() -> float:
+    """Oldest epoch timestamp still within the cache TTL."""
+    return time.time() - config.SERPAPI_CACHE_TTL_HOURS * 3600
+
+
+def _cache_db() -> sqlite3.Connection:
+    """Return the shared cache connection, creating the table and pruning expired rows on first use."""
+    global _cache_conn
+    if _cache_conn is None:
+        conn = sqlite3.connect(config.CACHE_FILE, check_same_thread=False)
+        # WAL appends each stored response to the log instead of rewriting
+        # pages in place; NORMAL skips the fsync per commit (a crash can only
+        # lose the newest cache rows, never corrupt the file).
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, ts REAL NOT NULL, response BLOB NOT NULL)"
+        )
+        conn.execute("DELETE FROM cache WHERE ts < ?", (_fresh_since(),))
+        conn.commit()
+        _cache_conn = conn
+    return _cache_conn
+
+
+def _encode(response: dict) -> bytes:
+    raw = orjson.dumps(response) if orjson else json.dumps(response).encode()
+    return zlib.compress(raw)
+
+
+def _decode(blob: bytes) -> dict | None:
+    """Stored response for blob, or None if it is truncated or corrupt (treated as a miss)."""
     try:
-        config.CACHE_FILE.write_text(json.dumps(pruned), encoding="utf-8")
-    except OSError:
-        pass  # Non-critical — cache is best-effort
+        raw = zlib.decompress(blob)
+        return orjson.loads(raw) if orjson else json.loads(raw)
+    except (zlib.error, ValueError):
+        return None
 
 
 def _cache_lookup(params: dict) -> dict | None:
@@ -79,28 +174,62 @@ def _cache_lookup(params: dict) -> dict | None:
     """
     if config.NO_CACHE:
         return None
-    key = _cache_key(params)
-    cache = _cache_load()
-    entry = cache.get(key)
-    if not entry:
-        return None
-    age_hours = (datetime.now(timezone.utc).timestamp() - entry.get("timestamp", 0)) / 3600
-    if age_hours > config.SERPAPI_CACHE_TTL_HOURS:
-        return None
-    return entry.get("response")
+    try:
+        with _cache_lock:
+            row = _cache_db().execute(
+                "SELECT response FROM cache WHERE key = ? AND ts >= ?", (_cache_key(params), _fresh_since())
+            ).fetchone()
+    except sqlite3.Error:
+        return None  # Non-critical — cache is best-effort
+    return _decode(row[0]) if row else None
+
+
+def _cache_lookup_many(params_list: list[dict]) -> list[dict | None]:
+    """_cache_lookup for several param sets in one query; results follow params_list order."""
+    if config.NO_CACHE or not params_list:
+        return [None] * len(params_list)
+    keys = [_cache_key(p) for p in params_list]
+    placeholders = ",".join("?" * len(keys))
+    try:
+        with _cache_lock:
+            rows = dict(_cache_db().execute(
+                f"SELECT key, response FROM cache WHERE key IN ({placeholders}) AND ts >= ?", (*keys, _fresh_since())
+            ).fetchall())
+    except sqlite3.Error:
+        return [None] * len(params_list)
+    return [_decode(rows[k]) if k in rows else None for k in keys]
 
 
 def _cache_store(params: dict, response: dict) -> None:
     """Persist a fresh SerpAPI response to the local cache."""
     if config.NO_CACHE:
         return
-    key = _cache_key(params)
-    cache = _cache_load()
-    cache[key] = {
-        "timestamp": datetime.now(timezone.utc).timestamp(),
-        "response": response,
-    }
-    _cache_save(cache)
+    _cache_store_many({_cache_key(params): response}, time.time())
+
+
+def _cache_store_many(responses: dict[str, dict], timestamp: float) -> None:
+    """
+    Write {cache_key: response} entries stamped with timestamp in one
+    transaction, replacing any existing rows for those keys.
+    """
+    rows = [(key, timestamp, _encode(response)) for key, response in responses.items()]
+    try:
+        with _cache_lock:
+            conn = _cache_db()
+            with conn:
+                conn.executemany("INSERT OR REPLACE INTO cache (key, ts, response) VALUES (?, ?, ?)", rows)
+    except sqlite3.Error:
+        pass  # Non-critical — cache is best-effort
+
+
+def _cache_size() -> int:
+    """Number of entries in the cache (0 if it can't be read)."""
+    try:
+        with _cache_lock:
+            (total,) = _cache_db().execute("SELECT COUNT(*) FROM cache").fetchone()
+    except sqlite3.Error:
+        return 0
+    return total
 
 
 # ── SerpAPI call ───────────────────────────────────────────────────────────────
@@ -113,29 +242,41 @@ _METRO_EXPANSION: dict[str, str] = {
     "CHI": "ORD,MDW",
     "YTO": "YYZ,YTZ",
     "BJS": "PEK,PKX",
-    "SEA": "SEA",  # SEA is fine as-is; listed to avoid accidental expansion
 }
 
 
+@lru_cache(maxsize=128)
 def _expand_airports(code: str) -> str:
-    """Expand known metro codes that SerpAPI rejects into comma-separated IATA codes."""
-    return _METRO_EXPANSION.get(code.upper(), code)
+    """Expand known metro codes that SerpAPI rejects into comma-separated IATA codes (uppercased)."""
+    u = code if code.isupper() else code.upper()
+    return _METRO_EXPANSION.get(u, u)
 
 
+@lru_cache(maxsize=256)
 def _departure_only(time_str: str) -> str:
     """Strip arrival portion from a time window string — SerpAPI only accepts 2 values."""
     parts = time_str.split(",")
     return f"{parts[0].strip()},{parts[1].strip()}" if len(parts) >= 2 else time_str
 
 
+# Params identical for every search; _build_params merges them in.
+_BASE_PARAMS = {
+    "engine": "google_flights",
+    "currency": "USD",
+    "hl": "en",
+    "gl": "us",
+    "deep_search": "true",
+}
+
+
 def _build_params(combo: SearchCombination) -> dict:
     """Convert a SearchCombination into SerpAPI query params."""
     params: dict = {
-        "engine": "google_flights",
-        "api_key": config.SERPAPI_KEY,
+        **_BASE_PARAMS,
+        "api_key": config.serpapi_key(),
         "departure_id": _expand_airports(combo.departure_id),
         "arrival_id": _expand_airports(combo.arrival_id),
-        "outbound_date": combo.outbound_date,
+        "outbound_date": combo.outbound_date.isoformat(),
         "type": str(combo.type),
         "travel_class": str(combo.travel_class),
         "adults": str(combo.adults),
@@ -143,14 +284,10 @@ def _build_params(combo: SearchCombination) -> dict:
         "stops": str(combo.stops),
         "sort_by": str(combo.sort_by),
         "bags": str(combo.bags),
-        "currency": "USD",
-        "hl": "en",
-        "gl": "us",
-        "deep_search": "true",
     }
 
     if combo.return_date:
-        params["return_date"] = combo.return_date
+        params["return_date"] = combo.return_date.isoformat()
 
     if combo.include_airlines:
         params["include_airlines"] = combo.include_airlines
@@ -172,6 +309,60 @@ def _build_params(combo: SearchCombination) -> dict:
     return params
 
 
+def _build_independent_oneway_params(
+    combo: SearchCombination, include_airline: str | None = None
+) -> tuple[dict, dict]:
+    """
+    (outbound, return) one-way params for the independent legs of a round-trip
+    combo. The combo's airline filters are dropped — post-filters handle airline
+    preferences, not SerpAPI params — unless include_airline is given (dual-fetch).
+    """
+    base = _build_params(combo)
+    base.pop("exclude_airlines", None)
+    if include_airline:
+        base["include_airlines"] = include_airline
+    else:
+        base.pop("include_airlines", None)
+    base["type"] = "2"
+    base.pop("return_date", None)
+
+    # _build_params already cut outbound_times to its departure window
+    outbound = dict(base)
+    outbound.pop("return_times", None)
+
+    # Return leg flies the route backwards, using the departure portion of the
+    # return time window as its outbound window. It is cut from the raw string
+    # (spaces kept) rather than _departure_only's stripped form, so the params
+    # and cache keys stay what they have always been.
+    ret = base
+    ret["departure_id"] = _expand_airports(combo.arrival_id)
+    ret["arrival_id"] = _expand_airports(combo.departure_id)
+    ret["outbound_date"] = combo.return_date.isoformat()
+    ret.pop("outbound_times", None)
+    if combo.return_times:
+        rt_parts = combo.return_times.split(",")
+        ret["outbound_times"] = f"{rt_parts[0]},{rt_parts[1]}" if len(rt_parts) >= 2 else combo.return_times
+    return outbound, ret
+
+
+# Per-cache-key locks: threads asking for the same params wait for the first
+# one's response to be cached instead of spending a second search on it.
+# Weak values: a key's lock goes away once no thread holds or waits on it.
+_key_locks: weakref.WeakValueDictionary[str, threading.Lock] = weakref.WeakValueDictionary()
+_key_locks_guard = threading.Lock()
+
+
+def _key_lock(params: dict) -> threading.Lock:
+    key = _cache_key(params)
+    with _key_locks_guard:
+        return _key_locks.setdefault(key, threading.Lock())
+
+
+def _first_group(response: dict) -> dict:
+    """First flight group of a response (best_flights before other_flights), or {}."""
+    return next(chain(response.get("best_flights", []), response.get("other_flights", [])), {})
+
+
 def _lookup_return_group(base_params: dict, departure_token: str) -> dict:
     """
     Lookup return-flight options for a selected outbound flight via departure_token.
@@ -180,62 +371,68 @@ def _lookup_return_group(base_params: dict, departure_token: str) -> dict:
     params = dict(base_params)
     params["departure_token"] = departure_token
 
-    # Check local cache first
-    cached = _cache_lookup(params)
-    if cached is not None:
-        groups = cached.get("best_flights", []) + cached.get("other_flights", [])
-        return groups[0] if groups else {}
+    # One caller at a time per param set, so concurrent duplicates hit the cache
+    with _key_lock(params):
+        # Check local cache first
+        cached = _cache_lookup(params)
+        if cached is not None:
+            return _first_group(cached)
 
-    try:
-        usage = _load_usage()
-        if usage["count"] >= config.SERPAPI_MONTHLY_LIMIT:
+        if not _reserve_usage():
             return {}
-
-        search = GoogleSearch(params)
-        results = search.get_dict()
-        error = results.get("error")
-        if error:
-            return {}
-
-        groups = results.get("best_flights", []) + results.get("other_flights", [])
-        if not groups:
+        counted = False
+        try:
+            search = GoogleSearch(params)
+            results = search.get_dict()
+            error = results.get("error")
+            if error:
+                return {}
+
+            first = _first_group(results)
+            if not first:
+                return {}
+
+            counted = True
+            _cache_store(params, results)
+            return first
+        except Exception:
             return {}
-
-        _increment_usage()
-        _cache_store(params, results)
-        return groups[0]
-    except Exception:
-        return {}
+        finally:
+            if not counted:
+                _release_usage()
 
 
 def _fetch_one_way_groups(params: dict, label: str = "") -> list[dict]:
     """Fetch one-way groups for a given parameter set, using local cache when available."""
-    # Check local cache first
-    cached = _cache_lookup(params)
-    if cached is not None:
-        if label:
-            print(f"    {label} (cached)", flush=True)
-        groups = cached.get("best_flights", []) + cached.get("other_flights", [])
-        return groups
-
-    try:
-        usage = _load_usage()
-        if usage["count"] >= config.SERPAPI_MONTHLY_LIMIT:
+    with _key_lock(params):
+        # Check local cache first
+        cached = _cache_lookup(params)
+        if cached is not None:
+            if label:
+                print(f"    {label} (cached)", flush=True)
+            groups = cached.get("best_flights", []) + cached.get("other_flights", [])
+            return groups
+
+        if not _reserve_usage():
             return []
-
-        search = GoogleSearch(params)
-        results = search.get_dict()
-        error = results.get("error")
-        if error:
+        counted = False
+        try:
+            search = GoogleSearch(params)
+            results = search.get_dict()
+            error = results.get("error")
+            if error:
+                return []
+
+            groups = results.get("best_flights", []) + results.get("other_flights", [])
+            if groups:
+                counted = True
+                _cache_store(params, results)
+            return groups
+        except Exception:
             return []
-
-        groups = results.get("best_flights", []) + results.get("other_flights", [])
-        if groups:
-            _increment_usage()
-            _cache_store(params, results)
-        return groups
-    except Exception:
-        return []
+        finally:
+            if not counted:
+                _release_usage()
 
 
 def fetch_combination(combo: SearchCombination, index: int, total: int) -> dict:
@@ -252,49 +449,59 @@ def fetch_combination(combo: SearchCombination, index: int, total: int) -> dict:
         remaining = config.SERPAPI_MONTHLY_LIMIT - usage["count"]
         print(f"⚠️   Warning: only {remaining} SerpAPI searches remaining this month.")
 
+    # Combinations run in parallel, so each status line is printed whole
     route = f"{combo.departure_id} → {combo.arrival_id} on {combo.outbound_date}"
-    print(f"  [{index}/{total}] Searching {route}...", end=" ", flush=True)
+    line = f"  [{index}/{total}] Searching {route}..."
 
     params = _build_params(combo)
 
-    # ── Cache lookup ───────────────────────────────────────────────────────────
-    cached = _cache_lookup(params)
-    if cached is not None:
-        flights_found = len(cached.get("best_flights", [])) + len(cached.get("other_flights", []))
-        print(f"🗄️  {flights_found} from cache  (monthly usage: {get_monthly_usage()}/{config.SERPAPI_MONTHLY_LIMIT})")
-        # Still enrich with return-leg data (also cached if available)
-        if combo.type == 1 and combo.return_date:
-            _enrich_return_legs(cached, params, combo)
-        return cached
-
-    try:
-        search = GoogleSearch(params)
-        results = search.get_dict()
-
-        error = results.get("error")
-        if error:
-            if "invalid api key" in str(error).lower():
-                print(f"⛔  API error: {error}")
-                return {"__fatal_error__": str(error)}
-            print(f"⚠️  API error: {error}")
+    with _key_lock(params):
+        # ── Cache lookup ───────────────────────────────────────────────────────
+        cached = _cache_lookup(params)
+        if cached is not None:
+            flights_found = len(cached.get("best_flights", [])) + len(cached.get("other_flights", []))
+            print(f"{line} 🗄️  {flights_found} from cache  (monthly usage: {get_monthly_usage()}/{config.SERPAPI_MONTHLY_LIMIT})")
+            # Still enrich with return-leg data (also cached if available)
+            if combo.type == 1 and combo.return_date:
+                _enrich_return_legs(cached, params, combo)
+            return cached
+
+        # Other workers may have used up the limit since the check above
+        if not _reserve_usage():
+            print(f"{line} ⛔  Monthly SerpAPI limit of {config.SERPAPI_MONTHLY_LIMIT} searches reached.")
             return {}
+        counted = False
+        try:
+            search = GoogleSearch(params)
+            results = search.get_dict()
+
+            error = results.get("error")
+            if error:
+                if "invalid api key" in str(error).lower():
+                    print(f"{line} ⛔  API error: {error}")
+                    return {"__fatal_error__": str(error)}
+                print(f"{line} ⚠️  API error: {error}")
+                return {}
+
+            counted = True
+            _cache_store(params, results)
 
-        _increment_usage()
-        _cache_store(params, results)
-
-        # For round-trip searches, fetch corresponding return-leg details
-        # for each outbound option using departure_token.
-        if combo.type == 1 and combo.return_date:
-            _enrich_return_legs(results, params, combo)
+            # For round-trip searches, fetch corresponding return-leg details
+            # for each outbound option using departure_token.
+            if combo.type == 1 and combo.return_date:
+                _enrich_return_legs(results, params, combo)
 
-        new_count = get_monthly_usage()
-        flights_found = len(results.get("best_flights", [])) + len(results.get("other_flights", []))
-        print(f"✅  {flights_found} flight options found  (monthly usage: {new_count}/{config.SERPAPI_MONTHLY_LIMIT})")
-        return results
+            new_count = get_monthly_usage()
+            flights_found = len(results.get("best_flights", [])) + len(results.get("other_flights", []))
+            print(f"{line} ✅  {flights_found} flight options found  (monthly usage: {new_count}/{config.SERPAPI_MONTHLY_LIMIT})")
+            return results
 
-    except Exception as exc:
-        print(f"❌  Failed: {exc}")
-        return {}
+        except Exception as exc:
+            print(f"{line} ❌  Failed: {exc}")
+            return {}
+        finally:
+            if not counted:
+                _release_usage()
 
 
 def _enrich_return_legs(results: dict, params: dict, combo: SearchCombination) -> None:
@@ -302,12 +509,19 @@ def _enrich_return_legs(results: dict, params: dict, combo: SearchCombination) -
     Mutates `results` in-place: for the top 5 outbound groups, fetches the
     corresponding return-leg details via departure_token and attaches them.
     """
-    all_groups = results.get("best_flights", []) + results.get("other_flights", [])
-    for group in all_groups[:5]:
-        token = group.get("departure_token")
-        if not token:
-            continue
-        return_group = _lookup_return_group(params, token)
+    top_groups = islice(chain(results.get("best_flights", []), results.get("other_flights", [])), 5)
+    tokened = [g for g in top_groups if g.get("departure_token")]
+    if not tokened:
+        return
+
+    # One cache query for all tokens; only misses go through _lookup_return_group
+    token_params = [{**params, "departure_token": g["departure_token"]} for g in tokened]
+    cached = _cache_lookup_many(token_params)
+    for group, token_p, hit in zip(tokened, token_params, cached):
+        if hit is not None:
+            return_group = _first_group(hit)
+        else:
+            return_group = _lookup_return_group(params, token_p["departure_token"])
         if not return_group:
             continue
         group["return_flights"] = return_group.get("flights", [])
@@ -317,144 +531,151 @@ def _enrich_return_legs(results: dict, params: dict, combo: SearchCombination) -
         group["return_extensions"] = return_group.get("extensions", [])
 
 
+# Common airline names → IATA codes, for dual-fetch include_airlines
+_NAME_TO_IATA: dict[str, str] = {
+    "spirit": "NK", "frontier": "F9", "southwest": "WN", "allegiant": "G4",
+    "sun country": "SY", "breeze": "MX", "avelo": "XP", "jetblue": "B6",
+    "alaska": "AS", "hawaiian": "HA", "united": "UA", "american": "AA",
+    "delta": "DL", "british airways": "BA", "lufthansa": "LH",
+}
+
+
+# Start times of SerpAPI requests issued by fetch_all's workers, spaced at
+# least SERPAPI_CALL_DELAY apart across threads.
+_throttle_lock = threading.Lock()
+_last_start = 0.0
+
+
+def _throttle() -> None:
+    """Block until SERPAPI_CALL_DELAY has passed since the previous throttled start."""
+    global _last_start
+    with _throttle_lock:
+        wait = _last_start + config.SERPAPI_CALL_DELAY - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        _last_start = time.monotonic()
+
+
+def _fetch_combo(combo: SearchCombination, index: int, total: int, stop: threading.Event) -> list[dict]:
+    """
+    Fetch one combination plus, for round trips, its independent one-way legs.
+    Returns nothing once `stop` is set (a fatal API error was seen elsewhere).
+    """
+    if stop.is_set():
+        return []
+    _throttle()
+    raw = fetch_combination(combo, index, total)
+    if raw.get("__fatal_error__"):
+        stop.set()
+        return [raw]
+    out = [raw]
+
+    # Also collect independent one-way options for round-trip queries
+    # so we can build combined itineraries with total pricing.
+    if combo.type == 1 and combo.return_date:
+        outbound_params, return_params = _build_independent_oneway_params(combo)
+        outbound_groups = _fetch_one_way_groups(outbound_params)
+        return_groups = _fetch_one_way_groups(return_params)
+
+        out.append({
+            "__independent_one_way__": True,
+            "combo": {
+                "departure_id": combo.departure_id,
+                "arrival_id": combo.arrival_id,
+                "outbound_date": combo.outbound_date.isoformat(),
+                "return_date": combo.return_date.isoformat(),
+            },
+            "outbound_groups": outbound_groups,
+            "return_groups": return_groups,
+        })
+
+    return out
+
+
+def _dual_fetch_route(combo: SearchCombination, airline_filters: list[PostFilter], stop: threading.Event) -> list[dict]:
+    """Run the targeted include_airlines one-way searches for one route/date pair."""
+    if stop.is_set():
+        return []
+    _throttle()
+    out = []
+    for af in airline_filters:
+        iata = _NAME_TO_IATA.get(af.value.lower(), af.value.upper()[:2])
+        line = f"  [dual-fetch] {combo.departure_id}→{combo.arrival_id} on {combo.outbound_date} with airline={iata}..."
+
+        out_p, ret_p = _build_independent_oneway_params(combo, include_airline=iata)
+        out_g = _fetch_one_way_groups(out_p)
+        ret_g = _fetch_one_way_groups(ret_p)
+        print(f"{line} ✅  {len(out_g)} out / {len(ret_g)} ret")
+
+        out.append({
+            "__independent_one_way__": True,
+            "combo": {
+                "departure_id": combo.departure_id,
+                "arrival_id": combo.arrival_id,
+                "outbound_date": combo.outbound_date.isoformat(),
+                "return_date": combo.return_date.isoformat(),
+            },
+            "outbound_groups": out_g,
+            "return_groups": ret_g,
+        })
+
+    return out
+
+
 def fetch_all(
     combinations: list[SearchCombination],
     post_filters: list[PostFilter] | None = None,
 ) -> list[dict]:
     """
-    Fetch all search combinations sequentially with rate-limit delay.
-    Returns list of raw SerpAPI response dicts (empty dicts skipped by processor).
+    Fetch all search combinations, up to SERPAPI_CONCURRENCY at a time, with
+    request starts spaced by the rate-limit delay.
+    Returns list of raw SerpAPI response dicts (empty dicts skipped by processor),
+    in combination order.
 
     If post_filters contains an 'at_least_one_leg_airline' filter, an additional
     targeted one-way search is run with include_airlines set to ensure the preferred
     airline's flights are captured even if they appear late in SerpAPI pagination.
     """
-    post_filters = post_filters or []
+    _reset_usage()
+    try:
+        return _fetch_all(combinations, post_filters or [])
+    finally:
+        flush_usage()
+
+
+def _fetch_all(combinations: list[SearchCombination], post_filters: list[PostFilter]) -> list[dict]:
+    """Body of fetch_all(), run between the usage reset and flush."""
     results = []
     total = len(combinations)
-
-    for i, combo in enumerate(combinations, start=1):
-        raw = fetch_combination(combo, i, total)
-        if raw.get("__fatal_error__"):
-            results.append(raw)
-            break
-        results.append(raw)
-
-        # Also collect independent one-way options for round-trip queries
-        # so we can build combined itineraries with total pricing.
-        if combo.type == 1 and combo.return_date:
-            base = _build_params(combo)
-            # Strip airline filters from independent one-way params —
-            # post-filters handle airline preferences, not SerpAPI params.
-            base.pop("include_airlines", None)
-            base.pop("exclude_airlines", None)
-
-            outbound_params = dict(base)
-            outbound_params["type"] = "2"
-            outbound_params.pop("return_date", None)
-            outbound_params.pop("return_times", None)
-            # Strip arrival portion from outbound_times for one-way (SerpAPI quirk)
-            if outbound_params.get("outbound_times"):
-                parts = outbound_params["outbound_times"].split(",")
-                if len(parts) == 4:
-                    outbound_params["outbound_times"] = f"{parts[0]},{parts[1]}"
-
-            return_params = dict(base)
-            return_params["type"] = "2"
-            return_params["departure_id"] = _expand_airports(combo.arrival_id)
-            return_params["arrival_id"] = _expand_airports(combo.departure_id)
-            return_params["outbound_date"] = combo.return_date
-            return_params.pop("return_date", None)
-            return_params.pop("outbound_times", None)
-            # For return one-way, use return time window as outbound window.
-            if combo.return_times:
-                rt_parts = combo.return_times.split(",")
-                # Use only departure portion for one-way
-                return_params["outbound_times"] = f"{rt_parts[0]},{rt_parts[1]}" if len(rt_parts) >= 2 else combo.return_times
-
-            outbound_groups = _fetch_one_way_groups(outbound_params)
-            return_groups = _fetch_one_way_groups(return_params)
-
-            results.append({
-                "__independent_one_way__": True,
-                "combo": {
-                    "departure_id": combo.departure_id,
-                    "arrival_id": combo.arrival_id,
-                    "outbound_date": combo.outbound_date,
-                    "return_date": combo.return_date,
-                },
-                "outbound_groups": outbound_groups,
-                "return_groups": return_groups,
-            })
-
-        if i < total:
-            time.sleep(config.SERPAPI_CALL_DELAY)
-
-    # ── Dual-fetch for soft airline preferences ────────────────────────────────
-    # For each "at_least_one_leg_airline" post-filter, run one targeted one-way
-    # search per unique route/date pair with include_airlines set. This ensures
-    # the preferred airline's flights appear even if paginated out above.
-    airline_filters = [f for f in post_filters if f.filter_type == "at_least_one_leg_airline"]
-    if airline_filters and combinations:
-        # Build IATA lookup from common airlines (name → code)
-        _NAME_TO_IATA = {
-            "spirit": "NK", "frontier": "F9", "southwest": "WN", "allegiant": "G4",
-            "sun country": "SY", "breeze": "MX", "avelo": "XP", "jetblue": "B6",
-            "alaska": "AS", "hawaiian": "HA", "united": "UA", "american": "AA",
-            "delta": "DL", "british airways": "BA", "lufthansa": "LH",
-        }
-
-        seen_routes: set[str] = set()
-        for combo in combinations:
-            route_key = f"{combo.departure_id}|{combo.arrival_id}|{combo.outbound_date}|{combo.return_date}"
-            if route_key in seen_routes or combo.type != 1 or not combo.return_date:
-                continue
-            seen_routes.add(route_key)
-
-            for af in airline_filters:
-                iata = _NAME_TO_IATA.get(af.value.lower(), af.value.upper()[:2])
-                print(f"  [dual-fetch] {combo.departure_id}→{combo.arrival_id} on {combo.outbound_date} with airline={iata}...", end=" ", flush=True)
-
-                base = _build_params(combo)
-                base["include_airlines"] = iata
-                base.pop("exclude_airlines", None)
-
-                out_p = dict(base)
-                out_p["type"] = "2"
-                out_p.pop("return_date", None)
-                out_p.pop("return_times", None)
-                if out_p.get("outbound_times"):
-                    parts = out_p["outbound_times"].split(",")
-                    if len(parts) == 4:
-                        out_p["outbound_times"] = f"{parts[0]},{parts[1]}"
-
-                ret_p = dict(base)
-                ret_p["type"] = "2"
-                ret_p["departure_id"] = _expand_airports(combo.arrival_id)
-                ret_p["arrival_id"] = _expand_airports(combo.departure_id)
-                ret_p["outbound_date"] = combo.return_date
-                ret_p.pop("return_date", None)
-                ret_p.pop("outbound_times", None)
-                if combo.return_times:
-                    rt_parts = combo.return_times.split(",")
-                    ret_p["outbound_times"] = f"{rt_parts[0]},{rt_parts[1]}" if len(rt_parts) >= 2 else combo.return_times
-
-                out_g = _fetch_one_way_groups(out_p)
-                ret_g = _fetch_one_way_groups(ret_p)
-                print(f"✅  {len(out_g)} out / {len(ret_g)} ret")
-
-                results.append({
-                    "__independent_one_way__": True,
-                    "combo": {
-                        "departure_id": combo.departure_id,
-                        "arrival_id": combo.arrival_id,
-                        "outbound_date": combo.outbound_date,
-                        "return_date": combo.return_date,
-                    },
-                    "outbound_groups": out_g,
-                    "return_groups": ret_g,
-                })
-
-            time.sleep(config.SERPAPI_CALL_DELAY)
+    stop = threading.Event()
+
+    # SerpAPI calls are network-bound, so overlap them in threads. map() yields
+    # in submission order, keeping results (and the fatal-error cut-off) as if
+    # run sequentially.
+    with ThreadPoolExecutor(max_workers=config.SERPAPI_CONCURRENCY) as pool:
+        indices = range(1, total + 1)
+        for batch in pool.map(_fetch_combo, combinations, indices, [total] * total, [stop] * total):
+            results.extend(batch)
+            if batch and batch[0].get("__fatal_error__"):
+                return results
+
+        # ── Dual-fetch for soft airline preferences ────────────────────────────
+        # For each "at_least_one_leg_airline" post-filter, run one targeted one-way
+        # search per unique route/date pair with include_airlines set. This ensures
+        # the preferred airline's flights appear even if paginated out above.
+        airline_filters = [f for f in post_filters if f.filter_type == "at_least_one_leg_airline"]
+        if airline_filters and combinations:
+            routes: list[SearchCombination] = []
+            seen_routes: set[str] = set()
+            for combo in combinations:
+                route_key = f"{combo.departure_id}|{combo.arrival_id}|{combo.outbound_date}|{combo.return_date}"
+                if route_key in seen_routes or combo.type != 1 or not combo.return_date:
+                    continue
+                seen_routes.add(route_key)
+                routes.append(combo)
+
+            n = len(routes)
+            for batch in pool.map(_dual_fetch_route, routes, [airline_filters] * n, [stop] * n):
+                results.extend(batch)
 
     return results
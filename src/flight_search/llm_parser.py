@@ -2,13 +2,17 @@
 
 from __future__ import annotations
 
+import asyncio
 import hashlib
-import json
-from datetime import date, datetime, timezone
+import re
+import sqlite3
+from datetime import date
+from functools import cache, lru_cache
 
-from openai import OpenAI
+import openai
+from openai import AsyncOpenAI, OpenAI
 
-from . import config
+from . import config, parse_cache
 from .models import ParsedQuery
 
 # Airline name → IATA code reference included in prompt so LLM has context
@@ -24,11 +28,12 @@ Full-service (for reference):
 Alliances (use exact string): STAR_ALLIANCE, SKYTEAM, ONEWORLD
 """
 
-_SYSTEM_PROMPT = f"""You are a flight search assistant. Convert the user's free-text flight query
+# Static instructions only — no per-run values — so the prompt is a byte-identical
+# prefix across calls and OpenAI's prompt caching can reuse it. Today's date goes
+# in a separate message after it (see _messages).
+_SYSTEM_PROMPT = """You are a flight search assistant. Convert the user's free-text flight query
 into a structured list of SerpAPI Google Flights search combinations.
 
-Today's date: {date.today().isoformat()}
-
 ────────────────────────────────────────────────
 RULE 1 — DATE RANGES WITH TIME-OF-DAY LOGIC
 ────────────────────────────────────────────────
@@ -49,23 +54,7 @@ post_filters instead (see Rule 8).
       The DEPARTING day's combination gets a late-departure window (e.g. "18,23").
       The arrival_before post_filter handles enforcing the next-day deadline.
 
-  Worked example for: "departing range 27 March evening, reaching Miami by 30 March 8AM"
-    Outbound date  | outbound_times | Reasoning
-    2026-03-27     | "18,23"        | First day, evening departure floor
-    2026-03-28     | null           | Middle day, unconstrained
-    2026-03-29     | "18,23"        | Late depart on Mar 29, overnight → arrives Mar 30 morning
-    2026-03-30     | "0,6"          | Last day: only very early departures can arrive by 8AM
-
-  Also emit: PostFilter(filter_type="arrival_before", value="2026-03-30T08:00", leg="outbound")
-  This post_filter is the authoritative arrival deadline check applied to ALL outbound combos.
-
-  Worked example for: "returning April 4 after 10AM, reaching by April 6 8AM"
-    Return date    | return_times   | Reasoning
-    2026-04-04     | "10,23"        | First day, post-10AM departure floor
-    2026-04-05     | null           | Middle day, unconstrained
-    2026-04-06     | "0,6"          | Last day: only early departures arrive by 8AM
-
-  Also emit: PostFilter(filter_type="arrival_before", value="2026-04-06T08:00", leg="return")
+  See the worked examples after these rules when they are included.
 
   COMBINATORIAL EXPLOSION GUARD: If (outbound_days × return_days × airport_alternatives)
   would exceed 20 combinations, collapse middle days and keep only first, one middle, last.
@@ -113,7 +102,7 @@ When not specified by user:
 ────────────────────────────────────────────────
 RULE 5 — RELATIVE DATES
 ────────────────────────────────────────────────
-Resolve against today ({date.today().isoformat()}).
+Resolve against today's date, given in the message after these instructions.
 "next Friday" = upcoming Friday from today.
 
 ────────────────────────────────────────────────
@@ -150,102 +139,256 @@ or that SerpAPI cannot express:
 
   filter_type="arrival_before"
     Keep itineraries where the specified leg arrives before the given datetime.
-    value = ISO-8601 datetime (e.g. "2026-03-30T08:00"). leg = "outbound"|"return"|"any".
+    value = ISO-8601 datetime (e.g. "2026-03-30T08:00"; the schema rejects anything else).
+    leg = "outbound"|"return"|"any".
 
 Emit post_filters whenever:
   - User says "at least one leg should be [airline]" (Rule 3b)
   - User says "reaching by [datetime]" (ALWAYS — regardless of whether you also set a departure window)
   - Any other constraint that would hard-filter SerpAPI results incorrectly
 
-{_COMMON_AIRLINES}
-
 Return valid JSON matching the ParsedQuery schema exactly.
 """
 
+# Reference material only some queries need, sent as a second system message
+# after the core rules so the core stays a shared cacheable prefix.
+_EXTENDED_EXAMPLES = f"""────────────────────────────────────────────────
+RULE 1 — WORKED EXAMPLES
+────────────────────────────────────────────────
+  Worked example for: "departing range 27 March evening, reaching Miami by 30 March 8AM"
+    Outbound date  | outbound_times | Reasoning
+    2026-03-27     | "18,23"        | First day, evening departure floor
+    2026-03-28     | null           | Middle day, unconstrained
+    2026-03-29     | "18,23"        | Late depart on Mar 29, overnight → arrives Mar 30 morning
+    2026-03-30     | "0,6"          | Last day: only very early departures can arrive by 8AM
+
+  Also emit: PostFilter(filter_type="arrival_before", value="2026-03-30T08:00", leg="outbound")
+  This post_filter is the authoritative arrival deadline check applied to ALL outbound combos.
+
+  Worked example for: "returning April 4 after 10AM, reaching by April 6 8AM"
+    Return date    | return_times   | Reasoning
+    2026-04-04     | "10,23"        | First day, post-10AM departure floor
+    2026-04-05     | null           | Middle day, unconstrained
+    2026-04-06     | "0,6"          | Last day: only early departures arrive by 8AM
+
+  Also emit: PostFilter(filter_type="arrival_before", value="2026-04-06T08:00", leg="return")
+
+{_COMMON_AIRLINES}"""
+
+_AIRLINE_NAMES = [name.strip() for name in re.findall(r"([A-Za-z][A-Za-z ]*)=", _COMMON_AIRLINES)]
+
+# Date-range and deadline wording — what Rule 1's per-day expansion and Rule 8's
+# arrival deadlines are about. Shared by the examples gate and _COMPLEX_QUERY.
+_DATE_RANGE_WORDS = ("range", "between", "through", "thru", "until", r"reach\w*", r"arriv\w*", "flexible")
+_DATE_RANGE_PATTERNS = r"\bby\s+\d|\d\s*[-–]\s*\d"  # "by 8AM", "10-12 March"
+
+
+def _marker_regex(words: tuple[str, ...]) -> re.Pattern:
+    """Case-insensitive match for any of words (whole words) or a date-range pattern."""
+    return re.compile(r"\b(" + "|".join(words) + r")\b|" + _DATE_RANGE_PATTERNS, re.IGNORECASE)
+
 
+# Date ranges, deadlines or airline mentions — queries the extended examples help with
+_NEEDS_EXAMPLES = _marker_regex(
+    (*_DATE_RANGE_WORDS, r"airlines?", r"carriers?", "alliance", *map(re.escape, _AIRLINE_NAMES))
+)
+
+# Routes parse calls to the same prompt cache; editing the prompt changes the key
+_PROMPT_CACHE_KEY = "flight-parse-" + hashlib.sha256(_SYSTEM_PROMPT.encode()).hexdigest()[:12]
+
+
+# Date ranges, deadlines and multi-leg trips — the parts of the prompt that
+# actually need deep reasoning.
+_COMPLEX_QUERY = _marker_regex((*_DATE_RANGE_WORDS, r"multi[- ]?city", "then"))
+
+
+def _choose_effort(text: str) -> str:
+    """Reasoning effort for a query: high for date ranges / deadlines, low for short simple ones."""
+    if _COMPLEX_QUERY.search(text):
+        return "high"
+    return "low" if len(text) < 120 else "medium"
+
+
+@cache
+def _get_client() -> OpenAI:
+    """Shared OpenAI client, built on first use so its connection pool is reused across parses."""
+    return OpenAI(api_key=config.openai_api_key())
+
+
+# Cleared the first time the Responses API turns out to be unavailable, so later
+# parses in this process go straight to chat completions.
+_responses_api_available = True
+
+
+# Built once and shared by every request — never mutate it
+_SYSTEM_MSG = {"role": "system", "content": _SYSTEM_PROMPT}
+_EXAMPLES_MSG = {"role": "system", "content": _EXTENDED_EXAMPLES}
+
+
+def _messages(text: str) -> list[dict]:
+    """
+    Static system prompt first (plus the worked examples when the query needs
+    them), then the per-run date and the (stripped) user query.
+    """
+    messages = [_SYSTEM_MSG]
+    if _NEEDS_EXAMPLES.search(text):
+        messages.append(_EXAMPLES_MSG)
+    messages.append({"role": "system", "content": f"Today's date: {date.today().isoformat()}"})
+    messages.append({"role": "user", "content": text})
+    return messages
+
+
+# Bump when _normalize_query changes — every cached parse is keyed on its output
+_QUERY_HASH_VERSION = b"v2:"
+
+
+def _normalize_query(text: str) -> str:
+    """Case, spacing and trailing punctuation don't change a query's meaning."""
+    return re.sub(r"\s+", " ", text.strip().lower()).rstrip(".,;! ")
+
+
+@lru_cache(maxsize=256)
 def _query_hash(text: str) -> str:
-    """Stable hash of the query text for cache invalidation."""
-    return hashlib.sha256(text.strip().encode()).hexdigest()[:16]
+    """Stable hash of the normalized query text for cache invalidation."""
+    return hashlib.sha256(_QUERY_HASH_VERSION + _normalize_query(text).encode()).hexdigest()[:16]
 
 
-def _save_parse(parsed: ParsedQuery, query_text: str) -> None:
-    """Persist parsed output to disk so subsequent runs reuse it without calling GPT."""
+def _parse_key(qhash: str) -> str:
+    """
+    Parse-cache key for a query hash. The model resolves relative dates ("next
+    Friday", "this weekend") against today's date, so a parse is only reused
+    on the day it was made.
+    """
+    return f"{date.today().isoformat()}:{qhash}"
+
+
+def _save_parse(parsed: ParsedQuery, qhash: str) -> None:
+    """Persist parsed output to disk so later runs today reuse it without calling GPT."""
     try:
-        data = {
-            "query_hash": _query_hash(query_text),
-            "timestamp": datetime.now(timezone.utc).timestamp(),
-            "parsed": parsed.model_dump(),
-        }
-        config.PARSED_CACHE_FILE.write_text(
-            json.dumps(data, indent=2), encoding="utf-8"
-        )
-    except OSError:
+        parse_cache.store(_parse_key(qhash), parsed.model_dump_json())
+    except (OSError, sqlite3.Error):
         pass  # Non-critical
 
 
-def _load_parse(query_text: str) -> ParsedQuery | None:
+def _load_parse(qhash: str) -> ParsedQuery | None:
     """
-    Return a previously persisted ParsedQuery if it matches the current query
-    text. Otherwise None.
+    Return the ParsedQuery persisted today for the query with this
+    _query_hash, or None if it hasn't been parsed today.
     """
     try:
-        if not config.PARSED_CACHE_FILE.exists():
-            return None
-        data = json.loads(config.PARSED_CACHE_FILE.read_text(encoding="utf-8"))
-        if data.get("query_hash") != _query_hash(query_text):
-            return None
-        return ParsedQuery.model_validate(data["parsed"])
-    except (OSError, KeyError, ValueError, json.JSONDecodeError):
+        stored = parse_cache.lookup(_parse_key(qhash))
+        return ParsedQuery.model_validate_json(stored) if stored is not None else None
+    except (OSError, sqlite3.Error, ValueError):
         return None
 
 
+def _request_kwargs(text: str) -> tuple[dict, dict]:
+    """(Responses API kwargs, chat completions kwargs) for one stripped query."""
+    effort = _choose_effort(text)
+    messages = _messages(text)
+    common = {"model": config.OPENAI_MODEL, "prompt_cache_key": _PROMPT_CACHE_KEY}
+    return (
+        {**common, "input": messages, "text_format": ParsedQuery, "reasoning": {"effort": effort}},
+        {**common, "messages": messages, "response_format": ParsedQuery, "reasoning_effort": effort},
+    )
+
+
+# Responses API errors that mean it isn't offered here at all (don't try it
+# again this run) vs. a request shape this endpoint rejected (fall back for
+# that call only).
+_RESPONSES_UNAVAILABLE = (AttributeError, openai.NotFoundError)
+_RESPONSES_REJECTED = openai.BadRequestError
+
+
+def _finish(parsed: ParsedQuery | None, qhash: str, refusal: str | None = None) -> ParsedQuery:
+    """Check the parse either API returned, persist it and hand it back."""
+    if refusal:
+        raise ValueError(f"GPT refused the request: {refusal}")
+    if parsed is None:
+        raise ValueError("Model did not return parsed structured output.")
+    _save_parse(parsed, qhash)
+    return parsed
+
+
 def parse_query(free_text: str, *, force: bool = False) -> ParsedQuery:
     """
     Return a ParsedQuery for the given free-text.
-    Reuses the last persisted parse if the query text matches.
+    Reuses a persisted parse if this query text has been parsed before.
     Pass force=True to skip the cache and always call GPT (equivalent to --reparse flag).
     """
+    # Hashed once up front: the cache lookup and the store after a GPT call share it
+    text = free_text.strip()
+    qhash = _query_hash(text)
+
     if not force:
-        cached = _load_parse(free_text)
+        cached = _load_parse(qhash)
         if cached is not None:
             print("🗄️   Using cached GPT parse (use --reparse to force a fresh parse)")
             return cached
 
-    client = OpenAI(api_key=config.OPENAI_API_KEY)
+    client = _get_client()
     print("🤖  Sending query to GPT for parsing...")
 
+    responses_kwargs, chat_kwargs = _request_kwargs(text)
+
     # Prefer Responses API for forward compatibility with newer models.
-    try:
-        response = client.responses.parse(
-            model=config.OPENAI_MODEL,
-            input=[
-                {"role": "system", "content": _SYSTEM_PROMPT},
-                {"role": "user", "content": free_text.strip()},
-            ],
-            text_format=ParsedQuery,
-            reasoning={"effort": "high"},
-        )
-        parsed_response = response.output_parsed
-        if parsed_response is not None:
-            _save_parse(parsed_response, free_text)
-            return parsed_response
-        raise ValueError("Model did not return parsed structured output.")
-    except Exception:
-        # Fallback for environments where chat.completions.parse is the stable path.
-        completion = client.beta.chat.completions.parse(
-            model=config.OPENAI_MODEL,
-            messages=[
-                {"role": "system", "content": _SYSTEM_PROMPT},
-                {"role": "user", "content": free_text.strip()},
-            ],
-            response_format=ParsedQuery,
-            reasoning_effort="high",
-        )
-
-        message = completion.choices[0].message
-        if message.refusal:
-            raise ValueError(f"GPT refused the request: {message.refusal}")
-
-        parsed: ParsedQuery = message.parsed  # type: ignore[assignment]
-        _save_parse(parsed, free_text)
-        return parsed
+    global _responses_api_available
+    if _responses_api_available:
+        try:
+            response = client.responses.parse(**responses_kwargs)
+        except _RESPONSES_UNAVAILABLE:
+            _responses_api_available = False
+        except _RESPONSES_REJECTED:
+            pass
+        else:
+            return _finish(response.output_parsed, qhash)
+
+    # Fallback for environments where chat.completions.parse is the stable path.
+    completion = client.beta.chat.completions.parse(**chat_kwargs)
+    message = completion.choices[0].message
+    return _finish(message.parsed, qhash, message.refusal)
+
+
+async def _aparse_one(client: AsyncOpenAI, text: str, qhash: str) -> ParsedQuery:
+    """Async twin of parse_query's GPT call for one stripped, uncached query."""
+    responses_kwargs, chat_kwargs = _request_kwargs(text)
+
+    global _responses_api_available
+    if _responses_api_available:
+        try:
+            response = await client.responses.parse(**responses_kwargs)
+        except _RESPONSES_UNAVAILABLE:
+            _responses_api_available = False
+        except _RESPONSES_REJECTED:
+            pass
+        else:
+            return _finish(response.output_parsed, qhash)
+
+    completion = await client.beta.chat.completions.parse(**chat_kwargs)
+    message = completion.choices[0].message
+    return _finish(message.parsed, qhash, message.refusal)
+
+
+def parse_queries(free_texts: list[str], *, force: bool = False) -> list[ParsedQuery]:
+    """
+    parse_query for several queries at once: cache hits are served directly and
+    the misses are sent to GPT concurrently. Results follow free_texts order.
+    """
+    texts = [t.strip() for t in free_texts]
+    hashes = [_query_hash(t) for t in texts]
+    parsed: dict[str, ParsedQuery | None] = {h: None if force else _load_parse(h) for h in hashes}
+
+    # One GPT call per distinct query, even if it appears more than once
+    misses = {h: t for h, t in zip(hashes, texts) if parsed[h] is None}
+    if misses:
+        print(f"🤖  Sending {len(misses)} queries to GPT for parsing...")
+
+        async def _parse_misses() -> list[ParsedQuery]:
+            # The async client's connection pool is tied to this event loop, so it
+            # is built per batch rather than shared like _get_client()
+            async with AsyncOpenAI(api_key=config.openai_api_key()) as client:
+                return await asyncio.gather(*(_aparse_one(client, t, h) for h, t in misses.items()))
+
+        parsed.update(zip(misses, asyncio.run(_parse_misses())))
+
+    return [parsed[h] for h in hashes]
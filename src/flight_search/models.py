@@ -1,8 +1,10 @@
-"""Pydantic models for the flight search agent."""
+"""Data models for the flight search agent."""
 
 from __future__ import annotations
-from typing import Literal, Optional
-from pydantic import BaseModel, Field
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Literal, Optional, Union
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 
 
 # ── LLM output models ─────────────────────────────────────────────────────────
@@ -12,13 +14,15 @@ class SearchCombination(BaseModel):
     One individual SerpAPI Google Flights call.
     The LLM expands date ranges / airport alternatives into separate combinations.
     """
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     # Airports (IATA codes, comma-separated for multi-airport)
     departure_id: str = Field(description="Departure airport IATA code(s), comma-separated, e.g. 'AUS' or 'JFK,EWR,LGA'")
     arrival_id: str = Field(description="Arrival airport IATA code(s), comma-separated, e.g. 'LAX' or 'LAX,BUR,LGB'")
 
     # Dates (YYYY-MM-DD)
-    outbound_date: str = Field(description="Departure date in YYYY-MM-DD format")
-    return_date: Optional[str] = Field(default=None, description="Return date in YYYY-MM-DD format, None for one-way")
+    outbound_date: date = Field(description="Departure date in YYYY-MM-DD format")
+    return_date: Optional[date] = Field(default=None, description="Return date in YYYY-MM-DD format, None for one-way")
 
     # Trip type: 1=round-trip, 2=one-way, 3=multi-city
     type: int = Field(default=1, description="1=round-trip, 2=one-way, 3=multi-city")
@@ -72,28 +76,14 @@ class SearchCombination(BaseModel):
     )
 
 
-class PostFilter(BaseModel):
+class _PostFilterBase(BaseModel):
     """
     A post-processing filter that the code applies after collecting SerpAPI results.
     Used for constraints that SerpAPI can't natively enforce (soft airline preferences,
     absolute arrival deadlines, cross-day arrival constraints, etc.).
     """
-    filter_type: Literal["at_least_one_leg_airline", "arrival_before"] = Field(
-        description=(
-            "Type of post-filter to apply. "
-            "'at_least_one_leg_airline': keep itineraries where at least one leg's airline "
-            "matches value (substring, case-insensitive). "
-            "'arrival_before': keep itineraries where the relevant leg arrives before the "
-            "ISO-8601 datetime in value (e.g. '2026-03-30T08:00')."
-        )
-    )
-    value: str = Field(
-        description=(
-            "The constraint value. "
-            "For 'at_least_one_leg_airline': airline name or IATA code (e.g. 'Frontier' or 'F9'). "
-            "For 'arrival_before': ISO-8601 datetime string (e.g. '2026-03-30T08:00')."
-        )
-    )
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     leg: Literal["outbound", "return", "any"] = Field(
         default="any",
         description=(
@@ -105,11 +95,44 @@ class PostFilter(BaseModel):
     )
 
 
+class AirlinePreferenceFilter(_PostFilterBase):
+    """Soft preference: itineraries with the airline on at least one leg sort first."""
+    filter_type: Literal["at_least_one_leg_airline"] = Field(
+        description=(
+            "Keep itineraries where at least one leg's airline matches value "
+            "(substring, case-insensitive)."
+        )
+    )
+    value: str = Field(description="Airline name or IATA code (e.g. 'Frontier' or 'F9').")
+
+
+class ArrivalBeforeFilter(_PostFilterBase):
+    """Hard filter: drop itineraries whose leg arrives after the deadline."""
+    filter_type: Literal["arrival_before"] = Field(
+        description="Keep itineraries where the relevant leg arrives before the datetime in value."
+    )
+    value: datetime = Field(description="ISO-8601 arrival deadline (e.g. '2026-03-30T08:00').")
+
+    @field_validator("value")
+    @classmethod
+    def _local_time(cls, value: datetime) -> datetime:
+        # Flight times are airport-local and naive; a stray UTC offset would make
+        # them incomparable, so keep the wall-clock time only.
+        return value.replace(tzinfo=None)
+
+
+# A plain (non-discriminated) union: OpenAI structured outputs accept anyOf but
+# not oneOf, and the filter_type literals already tell the variants apart.
+PostFilter = Union[AirlinePreferenceFilter, ArrivalBeforeFilter]
+
+
 class ParsedQuery(BaseModel):
     """
     Full output from the LLM: a list of search combinations to execute,
     plus a human-readable ranking preference for sorting results.
     """
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     combinations: list[SearchCombination] = Field(
         description="List of individual SerpAPI search calls to make. "
                     "Expand date ranges and airport alternatives into separate combinations."
@@ -134,7 +157,10 @@ class ParsedQuery(BaseModel):
 
 # ── Normalized result model (one row in Excel) ────────────────────────────────
 
-class FlightResult(BaseModel):
+# Built by our own code from already-typed SerpAPI data, so it needs no validation —
+# a slotted dataclass keeps the (possibly thousands of) rows small and quick to create.
+@dataclass(slots=True, kw_only=True)
+class FlightResult:
     """Flat, normalized flight result ready to be written as an Excel row."""
     itinerary_type: str = "round_trip"
     origin: str
@@ -168,5 +194,3 @@ class FlightResult(BaseModel):
     return_extensions: Optional[str] = None
     # Soft-preference flag — True when an at_least_one_leg_airline post-filter matched
     preferred: bool = False
-    # Dedup key (not written to Excel)
-    _dedup_key: str = ""
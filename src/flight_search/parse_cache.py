@@ -0,0 +1,40 @@
+"""Parse cache: sqlite store of GPT parses keyed by query hash."""
+
+from __future__ import annotations
+import sqlite3
+import time
+from contextlib import closing
+
+from . import config
+
+
+# Keys carry the day the parse was made (see llm_parser._parse_key), so a row
+# older than this can never be looked up again.
+_MAX_AGE_SECONDS = 24 * 3600
+
+
+# ── Connection ─────────────────────────────────────────────────────────────────
+# Touched at most twice per run (one lookup, one store), so each call opens its
+# own short-lived connection rather than holding one open for the process.
+
+def _connect() -> sqlite3.Connection:
+    conn = sqlite3.connect(config.PARSED_CACHE_DB)
+    conn.execute("CREATE TABLE IF NOT EXISTS parses (hash TEXT PRIMARY KEY, ts REAL NOT NULL, json TEXT NOT NULL)")
+    return conn
+
+
+# ── Lookup / store ─────────────────────────────────────────────────────────────
+
+def lookup(key: str) -> str | None:
+    """Return the stored parse JSON for key, or None if there is none."""
+    with closing(_connect()) as conn:
+        row = conn.execute("SELECT json FROM parses WHERE hash = ?", (key,)).fetchone()
+    return row[0] if row else None
+
+
+def store(key: str, parsed_json: str) -> None:
+    """Insert or replace the parse JSON stored for key, dropping rows too old to be looked up."""
+    now = time.time()
+    with closing(_connect()) as conn, conn:
+        conn.execute("DELETE FROM parses WHERE ts < ?", (now - _MAX_AGE_SECONDS,))
+        conn.execute("INSERT OR REPLACE INTO parses VALUES (?, ?, ?)", (key, now, parsed_json))
@@ -1,96 +1,102 @@
 """Normalizes raw SerpAPI responses into flat FlightResult objects."""
 
 from __future__ import annotations
+import sys
 from datetime import datetime
+from functools import lru_cache
+from itertools import chain
+from operator import attrgetter
 from .models import FlightResult, PostFilter
 
 
+# Values stamped on every FlightResult; interned so the dedup-key tuples that
+# contain them compare by identity
+_ROUND_TRIP = sys.intern("round_trip")
+_INDEPENDENT_ONE_WAY = sys.intern("independent_one_way")
+_USD = sys.intern("USD")
+_ECONOMY = sys.intern("Economy")
+
+
+@lru_cache(maxsize=1024)
 def _fmt_duration(minutes: int) -> str:
-    """Format minutes as '5h 42m'."""
+    """Format minutes as '5h 42m'. Layover lengths repeat a lot, so results are memoized."""
     h, m = divmod(minutes, 60)
     return f"{h}h {m:02d}m"
 
 
-def _process_flight_group(group: dict) -> FlightResult | None:
-    """Convert one SerpAPI FlightGroup dict into a FlightResult."""
-    segments: list[dict] = group.get("flights", [])
-    if not segments:
-        return None
+def _join_layovers(layovers: list[dict], show_overnight: bool = True) -> str:
+    """'2h 15m at LAS; 9h 40m at DEN (overnight)' for a leg's layovers, '' for nonstop."""
+    fmt = _fmt_duration
+    return "; ".join([
+        f"{fmt(lv.get('duration', 0))} at {lv.get('id') or lv.get('name') or '?'}"
+        f"{' (overnight)' if show_overnight and lv.get('overnight') else ''}"
+        for lv in layovers
+    ])
 
-    first = segments[0]
-    last = segments[-1]
 
-    # Airlines and flight numbers (concatenate across segments)
-    airlines = []
+def _aggregate_segments(segments: list[dict]) -> tuple[str, str, str, str, str]:
+    """
+    One pass over a leg's segments, returning joined
+    (airlines, flight_numbers, airplanes, legrooms, extensions).
+    Dicts double as insertion-ordered sets for the de-duplicated columns;
+    flight numbers keep every segment's entry.
+    """
+    airlines: dict[str, None] = {}
     flight_numbers = []
-    airplanes = []
-    legrooms = []
-    extensions_all = []
+    airplanes: dict[str, None] = {}
+    legrooms: dict[str, None] = {}
+    extensions: dict[str, None] = {}
 
     for seg in segments:
         airline = seg.get("airline", "")
-        if airline and airline not in airlines:
-            airlines.append(airline)
+        if airline:
+            airlines[airline] = None
         fn = seg.get("flight_number", "")
         if fn:
             flight_numbers.append(fn)
         ap = seg.get("airplane", "")
-        if ap and ap not in airplanes:
-            airplanes.append(ap)
+        if ap:
+            airplanes[ap] = None
         lr = seg.get("legroom", "")
-        if lr and lr not in legrooms:
-            legrooms.append(lr)
-        for ext in seg.get("extensions", []):
-            if ext not in extensions_all:
-                extensions_all.append(ext)
-
-    # Layovers
-    layovers: list[dict] = group.get("layovers", [])
-    layover_parts = []
-    for lv in layovers:
-        dur = _fmt_duration(lv.get("duration", 0))
-        code = lv.get("id", lv.get("name", "?"))
-        overnight = " (overnight)" if lv.get("overnight") else ""
-        layover_parts.append(f"{dur} at {code}{overnight}")
+        if lr:
+            legrooms[lr] = None
+        extensions.update(dict.fromkeys(seg.get("extensions", [])))
+
+    return (
+        ", ".join(airlines),
+        " / ".join(flight_numbers),
+        ", ".join(airplanes),
+        ", ".join(legrooms),
+        ", ".join(extensions),
+    )
+
+
+def _process_flight_group(group: dict) -> FlightResult | None:
+    """Convert one SerpAPI FlightGroup dict into a FlightResult."""
+    segments: list[dict] = group.get("flights", [])
+    if not segments:
+        return None
+
+    first = segments[0]
+    first_dep = first.get("departure_airport") or {}
+    last_arr = segments[-1].get("arrival_airport") or {}
+
+    airlines, flight_numbers, airplanes, legrooms, extensions = _aggregate_segments(segments)
+
+    layover_info = _join_layovers(group.get("layovers", []))
 
     stops = len(segments) - 1
 
     # Return-leg details (if available)
     return_segments: list[dict] = group.get("return_flights", [])
-    return_first = return_segments[0] if return_segments else {}
-    return_last = return_segments[-1] if return_segments else {}
+    return_dep = (return_segments[0].get("departure_airport") or {}) if return_segments else {}
+    return_arr = (return_segments[-1].get("arrival_airport") or {}) if return_segments else {}
     return_stops = (len(return_segments) - 1) if return_segments else None
 
-    return_airlines = []
-    return_flight_numbers = []
-    return_airplanes = []
-    return_legrooms = []
-    return_extensions_all = []
+    (return_airlines, return_flight_numbers, return_airplanes,
+     return_legrooms, return_extensions) = _aggregate_segments(return_segments)
 
-    for seg in return_segments:
-        airline = seg.get("airline", "")
-        if airline and airline not in return_airlines:
-            return_airlines.append(airline)
-        fn = seg.get("flight_number", "")
-        if fn:
-            return_flight_numbers.append(fn)
-        ap = seg.get("airplane", "")
-        if ap and ap not in return_airplanes:
-            return_airplanes.append(ap)
-        lr = seg.get("legroom", "")
-        if lr and lr not in return_legrooms:
-            return_legrooms.append(lr)
-        for ext in seg.get("extensions", []):
-            if ext not in return_extensions_all:
-                return_extensions_all.append(ext)
-
-    return_layovers: list[dict] = group.get("return_layovers", [])
-    return_layover_parts = []
-    for lv in return_layovers:
-        dur = _fmt_duration(lv.get("duration", 0))
-        code = lv.get("id", lv.get("name", "?"))
-        overnight = " (overnight)" if lv.get("overnight") else ""
-        return_layover_parts.append(f"{dur} at {code}{overnight}")
+    return_layover_info = _join_layovers(group.get("return_layovers", []))
 
     # Carbon emissions
     emissions_raw = group.get("carbon_emissions", {})
@@ -100,35 +106,35 @@ def _process_flight_group(group: dict) -> FlightResult | None:
     outbound_price = group.get("price")
 
     return FlightResult(
-        itinerary_type="round_trip",
-        origin=first.get("departure_airport", {}).get("id", ""),
-        destination=last.get("arrival_airport", {}).get("id", ""),
-        airline=", ".join(airlines),
-        flight_numbers=" / ".join(flight_numbers),
-        depart_time=first.get("departure_airport", {}).get("time", ""),
-        arrive_time=last.get("arrival_airport", {}).get("time", ""),
-        return_depart_time=return_first.get("departure_airport", {}).get("time") if return_segments else None,
-        return_arrive_time=return_last.get("arrival_airport", {}).get("time") if return_segments else None,
+        itinerary_type=_ROUND_TRIP,
+        origin=first_dep.get("id", ""),
+        destination=last_arr.get("id", ""),
+        airline=airlines,
+        flight_numbers=flight_numbers,
+        depart_time=first_dep.get("time", ""),
+        arrive_time=last_arr.get("time", ""),
+        return_depart_time=return_dep.get("time"),
+        return_arrive_time=return_arr.get("time"),
         stops=stops,
         return_stops=return_stops,
-        layover_info="; ".join(layover_parts),
-        return_layover_info="; ".join(return_layover_parts) if return_layover_parts else None,
+        layover_info=layover_info,
+        return_layover_info=return_layover_info or None,
         total_duration_mins=group.get("total_duration", 0),
         return_total_duration_mins=group.get("return_total_duration"),
         price=outbound_price or 0,
         outbound_price=outbound_price,
         total_price=outbound_price,
-        currency="USD",
-        travel_class=first.get("travel_class", "Economy"),
+        currency=_USD,
+        travel_class=first.get("travel_class", _ECONOMY),
         emissions_kg=emissions_kg,
-        airplane=", ".join(airplanes),
-        return_airplane=", ".join(return_airplanes) if return_airplanes else None,
-        legroom=", ".join(legrooms),
-        return_legroom=", ".join(return_legrooms) if return_legrooms else None,
-        extensions=", ".join(extensions_all),
-        return_flight_numbers=" / ".join(return_flight_numbers) if return_flight_numbers else None,
-        return_airline=", ".join(return_airlines) if return_airlines else None,
-        return_extensions=", ".join(return_extensions_all) if return_extensions_all else None,
+        airplane=airplanes,
+        return_airplane=return_airplanes or None,
+        legroom=legrooms,
+        return_legroom=return_legrooms or None,
+        extensions=extensions,
+        return_flight_numbers=return_flight_numbers or None,
+        return_airline=return_airlines or None,
+        return_extensions=return_extensions or None,
     )
 
 
@@ -139,35 +145,22 @@ def _extract_group_leg(group: dict) -> dict | None:
         return None
 
     first = segments[0]
-    last = segments[-1]
-    airlines = []
-    flight_numbers = []
-    for seg in segments:
-        airline = seg.get("airline", "")
-        if airline and airline not in airlines:
-            airlines.append(airline)
-        fn = seg.get("flight_number", "")
-        if fn:
-            flight_numbers.append(fn)
-
-    layover_parts = []
-    for lv in group.get("layovers", []):
-        dur = _fmt_duration(lv.get("duration", 0))
-        code = lv.get("id", lv.get("name", "?"))
-        layover_parts.append(f"{dur} at {code}")
+    first_dep = first.get("departure_airport") or {}
+    last_arr = segments[-1].get("arrival_airport") or {}
+    airlines, flight_numbers, *_ = _aggregate_segments(segments)
 
     return {
-        "origin": first.get("departure_airport", {}).get("id", ""),
-        "destination": last.get("arrival_airport", {}).get("id", ""),
-        "airline": ", ".join(airlines),
-        "flight_numbers": " / ".join(flight_numbers),
-        "depart_time": first.get("departure_airport", {}).get("time", ""),
-        "arrive_time": last.get("arrival_airport", {}).get("time", ""),
+        "origin": first_dep.get("id", ""),
+        "destination": last_arr.get("id", ""),
+        "airline": airlines,
+        "flight_numbers": flight_numbers,
+        "depart_time": first_dep.get("time", ""),
+        "arrive_time": last_arr.get("time", ""),
         "stops": len(segments) - 1,
-        "layover_info": "; ".join(layover_parts),
+        "layover_info": _join_layovers(group.get("layovers", []), show_overnight=False),
         "duration": group.get("total_duration", 0),
         "price": group.get("price", 0),
-        "travel_class": first.get("travel_class", "Economy"),
+        "travel_class": first.get("travel_class", _ECONOMY),
     }
 
 
@@ -178,24 +171,17 @@ def _build_independent_pairs(response: dict) -> list[FlightResult]:
     if not outbound_groups or not return_groups:
         return []
 
-    # Keep API and Excel sizes manageable.
-    top_out = outbound_groups[:3]
-    top_ret = return_groups[:3]
+    # Keep API and Excel sizes manageable. Each leg is extracted once, not once per pairing.
+    out_legs = [leg for g in outbound_groups[:3] if (leg := _extract_group_leg(g))]
+    ret_legs = [leg for g in return_groups[:3] if (leg := _extract_group_leg(g))]
 
     pairs: list[FlightResult] = []
-    for out_g in top_out:
-        out_leg = _extract_group_leg(out_g)
-        if not out_leg:
-            continue
-        for ret_g in top_ret:
-            ret_leg = _extract_group_leg(ret_g)
-            if not ret_leg:
-                continue
-
+    for out_leg in out_legs:
+        for ret_leg in ret_legs:
             total_price = int((out_leg.get("price") or 0) + (ret_leg.get("price") or 0))
             pairs.append(
                 FlightResult(
-                    itinerary_type="independent_one_way",
+                    itinerary_type=_INDEPENDENT_ONE_WAY,
                     origin=out_leg["origin"],
                     destination=out_leg["destination"],
                     airline=out_leg["airline"],
@@ -214,7 +200,7 @@ def _build_independent_pairs(response: dict) -> list[FlightResult]:
                     outbound_price=int(out_leg["price"]),
                     return_price=int(ret_leg["price"]),
                     total_price=total_price,
-                    currency="USD",
+                    currency=_USD,
                     travel_class=str(out_leg["travel_class"]),
                     emissions_kg=None,
                     airplane="",
@@ -230,11 +216,18 @@ def _build_independent_pairs(response: dict) -> list[FlightResult]:
     return pairs
 
 
+# Dedup key: itinerary type + flight numbers + depart times of both legs, as a
+# tuple so no key string has to be formatted per result.
+_dedup_key = attrgetter(
+    "itinerary_type", "flight_numbers", "depart_time", "return_flight_numbers", "return_depart_time"
+)
+
+
 def process_results(raw_responses: list[dict]) -> list[FlightResult]:
     """
     Process all SerpAPI responses into a deduplicated list of FlightResult objects.
     """
-    seen: set[str] = set()
+    seen: set[tuple] = set()
     results: list[FlightResult] = []
 
     for response in raw_responses:
@@ -243,28 +236,19 @@ def process_results(raw_responses: list[dict]) -> list[FlightResult]:
 
         if response.get("__independent_one_way__"):
             for result in _build_independent_pairs(response):
-                dedup_key = (
-                    f"{result.itinerary_type}|{result.flight_numbers}|{result.depart_time}|"
-                    f"{result.return_flight_numbers}|{result.return_depart_time}"
-                )
+                dedup_key = _dedup_key(result)
                 if dedup_key in seen:
                     continue
                 seen.add(dedup_key)
                 results.append(result)
             continue
 
-        all_groups = response.get("best_flights", []) + response.get("other_flights", [])
-
-        for group in all_groups:
+        for group in chain(response.get("best_flights") or (), response.get("other_flights") or ()):
             result = _process_flight_group(group)
             if result is None:
                 continue
 
-            # Dedup key: flight numbers + depart time
-            dedup_key = (
-                f"{result.itinerary_type}|{result.flight_numbers}|{result.depart_time}|"
-                f"{result.return_flight_numbers}|{result.return_depart_time}"
-            )
+            dedup_key = _dedup_key(result)
             if dedup_key in seen:
                 continue
             seen.add(dedup_key)
@@ -279,23 +263,57 @@ def sort_results(results: list[FlightResult], ranking_preference: str) -> list[F
     if "duration" in pref:
         return sorted(results, key=lambda r: (r.total_duration_mins + (r.return_total_duration_mins or 0)))
     elif "departure" in pref or "depart" in pref:
-        return sorted(results, key=lambda r: r.depart_time)
+        return sorted(results, key=attrgetter("depart_time"))
     elif "arrival" in pref or "arrive" in pref:
-        return sorted(results, key=lambda r: r.arrive_time)
+        return sorted(results, key=attrgetter("arrive_time"))
     else:
         # Default: price
         return sorted(results, key=lambda r: (r.total_price if r.total_price is not None else r.price))
 
 
+@lru_cache(maxsize=1024)
+def _lowered(airline: str | None) -> str:
+    """Lowercased airline string; the same few names repeat across every result."""
+    return (airline or "").lower()
+
+
 def _airline_matches(r: FlightResult, needle: str, leg: str) -> bool:
     """Return True if the flight result matches the airline needle on the specified leg(s)."""
-    out_match = needle in (r.airline or "").lower()
-    ret_match = needle in (r.return_airline or "").lower()
-    if leg == "outbound":
-        return out_match
-    if leg == "return":
-        return ret_match
-    return out_match or ret_match  # "any"
+    # Only look at the leg(s) actually being checked
+    if leg != "return" and needle in _lowered(r.airline):
+        return True
+    return leg != "outbound" and needle in _lowered(r.return_airline)
+
+
+# Arrival-time attribute(s) each arrival_before leg setting checks
+_ARRIVAL_FIELDS = {
+    "outbound": (attrgetter("arrive_time"),),
+    "return": (attrgetter("return_arrive_time"),),
+    "any": (attrgetter("arrive_time"), attrgetter("return_arrive_time")),
+}
+
+
+@lru_cache(maxsize=4096)
+def _parse_time(value: str) -> datetime | None:
+    """SerpAPI 'YYYY-MM-DD HH:MM' → datetime (None if unparseable). Many results share times."""
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+def _arrives_after(arrive_time: str | None, deadline: datetime, deadline_key: str) -> bool:
+    """
+    True only when arrive_time is present, parseable and later than deadline.
+    deadline_key is deadline in SerpAPI's 'YYYY-MM-DD HH:MM' form: times in that
+    exact form order the same as strings, so they are compared without parsing.
+    """
+    if not arrive_time:
+        return False
+    if len(arrive_time) == 16 and arrive_time[4] == "-" and arrive_time[10] == " " and arrive_time[13] == ":":
+        return arrive_time > deadline_key
+    arrival = _parse_time(arrive_time)
+    return arrival is not None and arrival > deadline
 
 
 def apply_post_filters(
@@ -309,56 +327,50 @@ def apply_post_filters(
       to the top; non-matching results are still included.
     - arrival_before: HARD filter — results arriving after the deadline are removed.
     """
+    log: list[str] = []  # Summaries are printed together once all filters have run
     for pf in post_filters:
         before = len(results)
 
         if pf.filter_type == "at_least_one_leg_airline":
             needle = pf.value.lower()
             # Stable sort: preferred-airline results first, rest appended after.
-            preferred = [r for r in results if _airline_matches(r, needle, pf.leg)]
-            others = [r for r in results if not _airline_matches(r, needle, pf.leg)]
-            for r in preferred:
-                r.preferred = True
+            preferred: list[FlightResult] = []
+            others: list[FlightResult] = []
+            matches, leg = _airline_matches, pf.leg
+            for r in results:
+                if matches(r, needle, leg):
+                    r.preferred = True
+                    preferred.append(r)
+                else:
+                    others.append(r)
             results = preferred + others
             after = len(results)
-            print(
+            log.append(
                 f"  🔍  Post-filter 'prefer_airline={pf.value}': "
                 f"{len(preferred)} preferred / {len(others)} other ({after} total)"
             )
             continue
 
         elif pf.filter_type == "arrival_before":
-            try:
-                deadline = datetime.fromisoformat(pf.value)
-            except ValueError:
-                print(f"  ⚠️  Post-filter 'arrival_before': invalid datetime '{pf.value}', skipping.")
-                continue
-            filtered = []
-            for r in results:
-                keep = True
-                if pf.leg in ("outbound", "any") and r.arrive_time:
-                    try:
-                        arr = datetime.fromisoformat(r.arrive_time)
-                        if arr > deadline:
-                            keep = False
-                    except ValueError:
-                        pass
-                if pf.leg in ("return", "any") and r.return_arrive_time and keep:
-                    try:
-                        ret_arr = datetime.fromisoformat(r.return_arrive_time)
-                        if ret_arr > deadline:
-                            keep = False
-                    except ValueError:
-                        pass
-                if keep:
-                    filtered.append(r)
-            results = filtered
+            deadline = pf.value  # Parsed to a naive datetime when the query was validated
+            # String fast path: SerpAPI's 'YYYY-MM-DD HH:MM' times compare as
+            # strings against the deadline in the same form. They are whole
+            # minutes, so truncating the deadline to the minute is exact.
+            deadline_key = deadline.strftime("%Y-%m-%d %H:%M")
+            legs = _ARRIVAL_FIELDS[pf.leg]
+            results = [
+                r for r in results
+                if not any(_arrives_after(get(r), deadline, deadline_key) for get in legs)
+            ]
 
         after = len(results)
         leg_label = f" ({pf.leg} leg)" if pf.leg != "any" else ""
-        print(
-            f"  🔍  Post-filter '{pf.filter_type}={pf.value}'{leg_label}: "
+        value = pf.value.isoformat(timespec="minutes") if pf.filter_type == "arrival_before" else pf.value
+        log.append(
+            f"  🔍  Post-filter '{pf.filter_type}={value}'{leg_label}: "
             f"{before} → {after} results ({before - after} removed)"
         )
 
+    if log:
+        print("\n".join(log))
     return results
@@ -0,0 +1,274 @@
+import unittest
+import json
+import tempfile
+import threading
+import time
+import zlib
+from datetime import date
+from pathlib import Path
+from unittest.mock import patch
+
+from flight_search import config
+from flight_search import flight_fetcher as ff
+from flight_search.flight_fetcher import (
+    _build_independent_oneway_params, _cache_db, _cache_key, _cache_lookup, _cache_lookup_many, _cache_size,
+    _cache_store, _cache_store_many, _expand_airports, fetch_all,
+)
+from flight_search.models import SearchCombination
+
+class TestSearchParams(unittest.TestCase):
+    def setUp(self):
+        self.key_patcher = patch.object(config, "serpapi_key", lambda: "k")
+        self.key_patcher.start()
+
+    def tearDown(self):
+        self.key_patcher.stop()
+
+    def test_expand_airports(self):
+        self.assertEqual(_expand_airports("WAS"), "DCA,IAD,BWI")
+        self.assertEqual(_expand_airports("nyc"), "JFK,EWR,LGA")
+        # Codes that need no expansion still come back uppercased
+        self.assertEqual(_expand_airports("SEA"), "SEA")
+        self.assertEqual(_expand_airports("sea"), "SEA")
+        self.assertEqual(_expand_airports("lax,bur"), "LAX,BUR")
+
+    def test_independent_one_way_time_windows(self):
+        combo = SearchCombination(
+            departure_id="SFO", arrival_id="JFK", outbound_date=date(2026, 5, 10), return_date=date(2026, 5, 18),
+            outbound_times="6, 12, 0, 23", return_times="10, 23, 0, 23", include_airlines="B6",
+        )
+        outbound, ret = _build_independent_oneway_params(combo)
+
+        self.assertEqual(outbound["outbound_times"], "6,12")
+        self.assertNotIn("return_times", outbound)
+        self.assertNotIn("include_airlines", outbound)
+        # The return leg's window is cut from the raw string, as it always has been
+        self.assertEqual(ret["outbound_times"], "10, 23")
+        self.assertEqual((ret["departure_id"], ret["arrival_id"], ret["outbound_date"]), ("JFK", "SFO", "2026-05-18"))
+        self.assertEqual(ret["type"], "2")
+        self.assertNotIn("return_date", ret)
+
+        _, dual_ret = _build_independent_oneway_params(combo, include_airline="NK")
+        self.assertEqual(dual_ret["include_airlines"], "NK")
+
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache_file = Path(self.temp_dir.name) / ".serp_cache.db"
+
+        self.patchers = [
+            patch.object(config, "CACHE_FILE", self.cache_file),
+            patch.object(config, "NO_CACHE", False),
+            patch.object(ff, "_cache_conn", None),  # Open a fresh connection on the temp file
+        ]
+        for p in self.patchers:
+            p.start()
+
+        self.params = {"departure_id": "SFO", "arrival_id": "JFK", "api_key": "k"}
+        self.response = {"best_flights": [{"price": 120}], "other_flights": []}
+
+    def tearDown(self):
+        if ff._cache_conn is not None:
+            ff._cache_conn.close()
+        for p in reversed(self.patchers):
+            p.stop()
+        self.temp_dir.cleanup()
+
+    def test_cache_db_creates_table(self):
+        conn = _cache_db()
+        self.assertTrue(self.cache_file.exists())
+        self.assertIs(conn, _cache_db())  # One shared connection
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM cache").fetchone(), (0,))
+
+    def test_store_and_lookup(self):
+        self.assertIsNone(_cache_lookup(self.params))
+        _cache_store(self.params, self.response)
+        self.assertEqual(_cache_lookup(self.params), self.response)
+        # api_key doesn't take part in the key
+        self.assertEqual(_cache_lookup({**self.params, "api_key": "other"}), self.response)
+        self.assertIsNone(_cache_lookup({**self.params, "arrival_id": "EWR"}))
+
+    def test_store_replaces_existing_key(self):
+        _cache_store(self.params, self.response)
+        _cache_store(self.params, {"best_flights": [], "other_flights": [{"price": 99}]})
+        self.assertEqual(_cache_lookup(self.params)["other_flights"], [{"price": 99}])
+        self.assertEqual(_cache_size(), 1)
+
+    def test_expired_rows_are_ignored_and_pruned_on_open(self):
+        stale = time.time() - (config.SERPAPI_CACHE_TTL_HOURS + 1) * 3600
+        _cache_store_many({_cache_key(self.params): self.response}, stale)
+        self.assertIsNone(_cache_lookup(self.params))
+        self.assertEqual(_cache_size(), 1)
+
+        # Reopening the file drops the expired row
+        ff._cache_conn.close()
+        ff._cache_conn = None
+        self.assertEqual(_cache_size(), 0)
+
+    def test_no_cache_bypasses_store_and_lookup(self):
+        _cache_store(self.params, self.response)
+        with patch.object(config, "NO_CACHE", True):
+            self.assertIsNone(_cache_lookup(self.params))
+            self.assertEqual(_cache_lookup_many([self.params]), [None])
+            _cache_store({**self.params, "arrival_id": "EWR"}, self.response)
+        self.assertIsNone(_cache_lookup({**self.params, "arrival_id": "EWR"}))
+        self.assertEqual(_cache_size(), 1)
+
+    def test_lookup_many_follows_params_order(self):
+        other = {**self.params, "departure_token": "t1"}
+        missing = {**self.params, "departure_token": "t2"}
+        _cache_store(self.params, self.response)
+        _cache_store(other, {"best_flights": [{"price": 5}]})
+
+        self.assertEqual(
+            _cache_lookup_many([missing, other, self.params]),
+            [None, {"best_flights": [{"price": 5}]}, self.response],
+        )
+        self.assertEqual(_cache_lookup_many([]), [])
+
+    def test_store_many_keeps_unrelated_entries(self):
+        _cache_store(self.params, self.response)
+        other_key = _cache_key({**self.params, "arrival_id": "EWR"})
+        self.assertIsNone(_cache_store_many({other_key: self.response}, time.time()))
+        self.assertEqual(_cache_size(), 2)
+        self.assertEqual(_cache_lookup(self.params), self.response)
+
+    def test_corrupt_rows_are_misses(self):
+        truncated = {**self.params, "departure_token": "t1"}
+        not_json = {**self.params, "departure_token": "t2"}
+        _cache_store(self.params, self.response)
+        _cache_store(truncated, self.response)
+        _cache_store(not_json, self.response)
+        conn = _cache_db()
+        with conn:
+            blob = conn.execute("SELECT response FROM cache WHERE key = ?", (_cache_key(truncated),)).fetchone()[0]
+            conn.execute("UPDATE cache SET response = ? WHERE key = ?", (blob[:-5], _cache_key(truncated)))
+            conn.execute("UPDATE cache SET response = ? WHERE key = ?", (zlib.compress(b"{oops"), _cache_key(not_json)))
+
+        self.assertIsNone(_cache_lookup(truncated))
+        self.assertIsNone(_cache_lookup(not_json))
+        self.assertEqual(_cache_lookup_many([truncated, self.params, not_json]), [None, self.response, None])
+
+    def test_unreadable_cache_is_best_effort(self):
+        self.cache_file.write_bytes(b"not a sqlite database")
+        self.assertIsNone(_cache_lookup(self.params))
+        self.assertEqual(_cache_size(), 0)
+
+
+class StubSearch:
+    """Stands in for serpapi.GoogleSearch: records each call and answers per arrival_id."""
+    calls: list[tuple[float, dict]] = []
+    delays: dict[str, float] = {}
+    errors: dict[str, str] = {}
+    lock = threading.Lock()
+
+    def __init__(self, params):
+        self.params = dict(params)
+
+    def get_dict(self):
+        arrival = self.params["arrival_id"]
+        with self.lock:
+            StubSearch.calls.append((time.monotonic(), self.params))
+        time.sleep(self.delays.get(arrival, 0))
+        if arrival in self.errors:
+            return {"error": self.errors[arrival]}
+        return {"best_flights": [{"price": 100, "flights": [{"airline": arrival}]}], "other_flights": []}
+
+
+class TestFetchAll(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        tmp = Path(self.temp_dir.name)
+        StubSearch.calls, StubSearch.delays, StubSearch.errors = [], {}, {}
+
+        self.patchers = [
+            patch.object(ff, "GoogleSearch", StubSearch),
+            patch.object(ff, "_cache_conn", None),
+            patch.object(config, "CACHE_FILE", tmp / ".serp_cache.db"),
+            patch.object(config, "USAGE_FILE", tmp / ".serpapi_usage.json"),
+            patch.object(config, "NO_CACHE", False),
+            patch.object(config, "SERPAPI_CALL_DELAY", 0),
+            patch.object(config, "SERPAPI_CONCURRENCY", 4),
+            patch.object(config, "serpapi_key", lambda: "k"),
+            patch("builtins.print"),
+        ]
+        for p in self.patchers:
+            p.start()
+
+    def tearDown(self):
+        if ff._cache_conn is not None:
+            ff._cache_conn.close()
+        for p in reversed(self.patchers):
+            p.stop()
+        self.temp_dir.cleanup()
+
+    def _one_way(self, arrival: str) -> SearchCombination:
+        return SearchCombination(departure_id="SFO", arrival_id=arrival, outbound_date=date(2026, 5, 10), type=2)
+
+    def _arrivals(self, results: list[dict]) -> list[str]:
+        return [r["best_flights"][0]["flights"][0]["airline"] if r.get("best_flights") else r for r in results]
+
+    def _usage(self) -> int:
+        return json.loads(config.USAGE_FILE.read_text())["count"]
+
+    def test_results_follow_combination_order(self):
+        # Earlier combinations finish last
+        StubSearch.delays = {"AAA": 0.15, "BBB": 0.1, "CCC": 0.05}
+        combos = [self._one_way(a) for a in ("AAA", "BBB", "CCC", "DDD")]
+        self.assertEqual(self._arrivals(fetch_all(combos)), ["AAA", "BBB", "CCC", "DDD"])
+        self.assertEqual(self._usage(), 4)
+
+    def test_duplicate_params_search_once(self):
+        StubSearch.delays = {"AAA": 0.05}
+        results = fetch_all([self._one_way("AAA"), self._one_way("AAA")])
+        self.assertEqual(self._arrivals(results), ["AAA", "AAA"])
+        self.assertEqual(len(StubSearch.calls), 1)  # The second waits, then hits the cache
+        self.assertEqual(len(ff._key_locks), 0)     # Key locks don't outlive the fetch
+
+    def test_fatal_error_cuts_off_results(self):
+        arrivals = ("AAA", "BBB", "CCC", "DDD", "EEE", "FFF", "GGG", "HHH")
+        # The error comes back while the other workers are still busy
+        StubSearch.delays = dict.fromkeys(arrivals, 0.05)
+        StubSearch.delays["CCC"] = 0
+        StubSearch.errors = {"CCC": "Invalid API key."}
+        combos = [self._one_way(a) for a in arrivals]
+        results = fetch_all(combos)
+        self.assertEqual(self._arrivals(results[:2]), ["AAA", "BBB"])
+        self.assertEqual(results[2:], [{"__fatal_error__": "Invalid API key."}])
+        # Combinations not yet started when the error came back are skipped
+        self.assertLess(len(StubSearch.calls), len(combos))
+
+    def test_request_starts_are_throttled(self):
+        starts = []
+        fetch_combination = ff.fetch_combination
+
+        def timed(*args):
+            starts.append(time.monotonic())  # Right after the worker's _throttle()
+            return fetch_combination(*args)
+
+        with patch.object(config, "SERPAPI_CALL_DELAY", 0.05), patch.object(ff, "fetch_combination", timed):
+            fetch_all([self._one_way(a) for a in ("AAA", "BBB", "CCC", "DDD")])
+        starts.sort()
+        self.assertEqual(len(starts), 4)
+        for prev, cur in zip(starts, starts[1:]):
+            self.assertGreaterEqual(cur - prev, 0.04)
+
+    def test_concurrent_workers_respect_monthly_limit(self):
+        # Every worker is mid-call at once, so none may rely on a count read before the others finish
+        StubSearch.delays = dict.fromkeys(("AAA", "BBB", "CCC", "DDD", "EEE", "FFF"), 0.05)
+        with patch.object(config, "SERPAPI_MONTHLY_LIMIT", 2):
+            results = fetch_all([self._one_way(a) for a in ("AAA", "BBB", "CCC", "DDD", "EEE", "FFF")])
+        self.assertEqual(sum(1 for r in results if r.get("best_flights")), 2)
+        self.assertEqual(len(StubSearch.calls), 2)
+        self.assertEqual(self._usage(), 2)
+
+    def test_failed_calls_are_not_counted(self):
+        StubSearch.errors = {"BBB": "Temporary failure"}
+        results = fetch_all([self._one_way(a) for a in ("AAA", "BBB", "CCC")])
+        self.assertEqual(self._arrivals(results), ["AAA", {}, "CCC"])
+        self.assertEqual(self._usage(), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,23 +1,28 @@
 import unittest
 import tempfile
 import json
+import time
+from datetime import date
 from pathlib import Path
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, AsyncMock, MagicMock
 
-from flight_search import config
-from flight_search.llm_parser import _query_hash, _save_parse, _load_parse, parse_query
-from flight_search.models import ParsedQuery
+from flight_search import config, parse_cache
+from flight_search.llm_parser import _EXAMPLES_MSG, _choose_effort, _get_client, _messages, _query_hash, _save_parse, _load_parse, parse_queries, parse_query
+from flight_search.models import ArrivalBeforeFilter, ParsedQuery, SearchCombination
 
 class TestLLMParser(unittest.TestCase):
     def setUp(self):
         # Create a temporary file for the cache
         self.temp_dir = tempfile.TemporaryDirectory()
-        self.temp_cache = Path(self.temp_dir.name) / ".last_parse.json"
+        self.temp_cache = Path(self.temp_dir.name) / ".parse_cache.db"
         
         # Patch the config to use our temp cache
-        self.config_patcher = patch('flight_search.llm_parser.config.PARSED_CACHE_FILE', self.temp_cache)
+        self.config_patcher = patch('flight_search.llm_parser.config.PARSED_CACHE_DB', self.temp_cache)
         self.config_patcher.start()
 
+        # Each test patches OpenAI, so don't reuse a client built by an earlier one
+        _get_client.cache_clear()
+
         self.sample_query = "round trip from SFO to JFK"
         self.sample_parsed = ParsedQuery(
             query_summary="SFO to JFK",
@@ -28,6 +33,7 @@ class TestLLMParser(unittest.TestCase):
 
     def tearDown(self):
         self.config_patcher.stop()
+        _get_client.cache_clear()
         self.temp_dir.cleanup()
 
     def test_query_hash_consistency(self):
@@ -36,27 +42,75 @@ class TestLLMParser(unittest.TestCase):
         hash3 = _query_hash("test query ") # Should strip whitespace
         self.assertEqual(hash1, hash2)
         self.assertEqual(hash1, hash3)
+        # Case, spacing and trailing punctuation are normalized away
+        self.assertEqual(hash1, _query_hash("  Test   QUERY.\n"))
         self.assertNotEqual(hash1, _query_hash("different query"))
 
     def test_save_and_load_parse(self):
         # Initially empty
-        self.assertIsNone(_load_parse(self.sample_query))
+        self.assertIsNone(_load_parse(_query_hash(self.sample_query)))
 
         # Save
-        _save_parse(self.sample_parsed, self.sample_query)
+        _save_parse(self.sample_parsed, _query_hash(self.sample_query))
 
         # Load with same query
-        loaded = _load_parse(self.sample_query)
+        loaded = _load_parse(_query_hash(self.sample_query))
         self.assertIsNotNone(loaded)
         self.assertEqual(loaded.query_summary, "SFO to JFK")
 
         # Load with different query (hash mismatch)
-        self.assertIsNone(_load_parse("different query"))
+        self.assertIsNone(_load_parse(_query_hash("different query")))
+
+    def test_saved_parse_round_trips_exactly(self):
+        parsed = self.sample_parsed.model_copy(update={
+            "combinations": [SearchCombination(
+                departure_id="SFO", arrival_id="JFK,EWR",
+                outbound_date="2026-05-10", return_date="2026-05-18",
+                outbound_times="18,23", max_price=400,
+            )],
+            "post_filters": [ArrivalBeforeFilter(filter_type="arrival_before", value="2026-05-11T08:00", leg="outbound")],
+        })
+        _save_parse(parsed, _query_hash(self.sample_query))
+        self.assertEqual(_load_parse(_query_hash(self.sample_query)), parsed)
+
+    def test_parses_for_different_queries_are_kept(self):
+        other_parsed = self.sample_parsed.model_copy(update={"query_summary": "LAX to SEA"})
+        _save_parse(self.sample_parsed, _query_hash(self.sample_query))
+        _save_parse(other_parsed, _query_hash("round trip from LAX to SEA"))
+
+        # Saving the second query must not evict the first
+        self.assertEqual(_load_parse(_query_hash(self.sample_query)).query_summary, "SFO to JFK")
+        self.assertEqual(_load_parse(_query_hash("round trip from LAX to SEA")).query_summary, "LAX to SEA")
+
+    def test_date_range_queries_get_worked_examples(self):
+        for query in ("SFO to JFK between May 3 and May 5", "SFO to JFK 10-12 March", "SFO to JFK on Frontier"):
+            self.assertIn(_EXAMPLES_MSG, _messages(query), query)
+        # A bare "by" is not a deadline
+        self.assertNotIn(_EXAMPLES_MSG, _messages("SFO to JFK, fly by Friday"))
+        # Date-range wording gets both the examples and high effort
+        self.assertEqual(_choose_effort("SFO to JFK between May 3 and May 5"), "high")
+
+    def test_parses_are_only_reused_the_same_day(self):
+        qhash = _query_hash("round trip from SFO to JFK next Friday")
+        with patch('flight_search.llm_parser.date', MagicMock(today=MagicMock(return_value=date(2026, 5, 1)))):
+            _save_parse(self.sample_parsed, qhash)
+            self.assertIsNotNone(_load_parse(qhash))
+        # "next Friday" meant something else yesterday
+        with patch('flight_search.llm_parser.date', MagicMock(today=MagicMock(return_value=date(2026, 5, 2)))):
+            self.assertIsNone(_load_parse(qhash))
+
+    def test_store_prunes_parses_older_than_a_day(self):
+        two_days_ago = time.time() - 2 * 24 * 3600
+        with patch.object(parse_cache.time, 'time', return_value=two_days_ago):
+            parse_cache.store("old", "{}")
+        parse_cache.store("new", "{}")
+        self.assertIsNone(parse_cache.lookup("old"))
+        self.assertEqual(parse_cache.lookup("new"), "{}")
 
     @patch('flight_search.llm_parser.OpenAI')
     def test_parse_query_uses_cache(self, mock_openai):
         # Save a cached version
-        _save_parse(self.sample_parsed, self.sample_query)
+        _save_parse(self.sample_parsed, _query_hash(self.sample_query))
 
         # Call parse_query
         result = parse_query(self.sample_query)
@@ -68,7 +122,7 @@ class TestLLMParser(unittest.TestCase):
     @patch('flight_search.llm_parser.OpenAI')
     def test_parse_query_force_reparse(self, mock_openai):
         # Save a cached version
-        _save_parse(self.sample_parsed, self.sample_query)
+        _save_parse(self.sample_parsed, _query_hash(self.sample_query))
 
         # Setup mock OpenAI response
         mock_client = MagicMock()
@@ -89,5 +143,63 @@ class TestLLMParser(unittest.TestCase):
         self.assertEqual(result.query_summary, "New Parse")
         mock_client.responses.parse.assert_called_once()
 
+    @patch('flight_search.llm_parser._responses_api_available', True)
+    @patch('flight_search.llm_parser.OpenAI')
+    def test_parse_query_falls_back_when_responses_api_missing(self, mock_openai):
+        mock_client = MagicMock()
+        mock_openai.return_value = mock_client
+        mock_client.responses.parse.side_effect = AttributeError("responses")
+        mock_message = MagicMock(refusal=None, parsed=self.sample_parsed)
+        mock_client.beta.chat.completions.parse.return_value = MagicMock(choices=[MagicMock(message=mock_message)])
+
+        self.assertEqual(parse_query(self.sample_query, force=True).query_summary, "SFO to JFK")
+        parse_query(self.sample_query, force=True)
+
+        # Responses API is only tried once; both calls are served by chat completions
+        mock_client.responses.parse.assert_called_once()
+        self.assertEqual(mock_client.beta.chat.completions.parse.call_count, 2)
+
+    @patch('flight_search.llm_parser._responses_api_available', True)
+    @patch('flight_search.llm_parser.AsyncOpenAI')
+    def test_parse_queries_only_sends_uncached_queries(self, mock_async_openai):
+        _save_parse(self.sample_parsed, _query_hash(self.sample_query))
+
+        mock_client = MagicMock()
+        mock_async_openai.return_value.__aenter__ = AsyncMock(return_value=mock_client)
+        mock_async_openai.return_value.__aexit__ = AsyncMock(return_value=False)
+        new_parsed = self.sample_parsed.model_copy(update={"query_summary": "LAX to SEA"})
+        mock_client.responses.parse = AsyncMock(return_value=MagicMock(output_parsed=new_parsed))
+
+        results = parse_queries([self.sample_query, "LAX to SEA", "lax to sea"])
+
+        # The cached query is served locally; the two spellings of the new one share a call
+        self.assertEqual([r.query_summary for r in results], ["SFO to JFK", "LAX to SEA", "LAX to SEA"])
+        mock_client.responses.parse.assert_awaited_once()
+        self.assertEqual(_load_parse(_query_hash("LAX to SEA")), new_parsed)
+
+    @patch('flight_search.llm_parser._responses_api_available', False)
+    @patch('flight_search.llm_parser.AsyncOpenAI')
+    @patch('flight_search.llm_parser.OpenAI')
+    def test_sync_and_async_paths_share_refusal_handling(self, mock_openai, mock_async_openai):
+        refused = MagicMock(choices=[MagicMock(message=MagicMock(refusal="no", parsed=None))])
+        mock_openai.return_value.beta.chat.completions.parse.return_value = refused
+
+        mock_client = MagicMock()
+        mock_async_openai.return_value.__aenter__ = AsyncMock(return_value=mock_client)
+        mock_async_openai.return_value.__aexit__ = AsyncMock(return_value=False)
+        mock_client.beta.chat.completions.parse = AsyncMock(return_value=refused)
+
+        with self.assertRaisesRegex(ValueError, "refused"):
+            parse_query(self.sample_query, force=True)
+        with self.assertRaisesRegex(ValueError, "refused"):
+            parse_queries([self.sample_query], force=True)
+
+        # Both sent the same request, and neither cached anything
+        self.assertEqual(
+            mock_openai.return_value.beta.chat.completions.parse.call_args,
+            mock_client.beta.chat.completions.parse.call_args,
+        )
+        self.assertIsNone(_load_parse(_query_hash(self.sample_query)))
+
 if __name__ == '__main__':
     unittest.main()